@@ -6,7 +6,6 @@ This replaces the legacy voice_browser_server.py with a clean, async implementat
 """
 
 import argparse
-import asyncio
 import os
 import subprocess
 import sys
@@ -16,6 +15,7 @@ from pathlib import Path
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from vosk_voice_assistant.runtime import run
 from vosk_voice_assistant.servers import start_voice_server
 
 
@@ -58,4 +58,4 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -19,6 +19,10 @@ import time
 import websockets
 from websockets.exceptions import ConnectionClosed, InvalidMessage
 
+# Shared event loop helper (uvloop when installed)
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from vosk_voice_assistant.runtime import run
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -29,6 +33,10 @@ logger = logging.getLogger('voice_server')
 # Suppress VOSK warnings
 logging.getLogger('vosk').setLevel(logging.ERROR)
 
+# Broadcasts scheduled from recognition threads but not yet sent; beyond this
+# new results are dropped so slow clients cannot back up the event loop
+MAX_PENDING_BROADCASTS = 32
+
 @dataclass
 class VoiceResult:
     text: str
@@ -58,7 +66,8 @@ class VoiceEngine:
             logger.error(f"❌ Failed to load {self.language} model: {e}")
             raise
     
-    def start_listening(self, callback: Callable[[str, float], None], duration: Optional[int] = None):
+    def start_listening(self, callback: Callable[[str, float], None], duration: int | None = None,
+                        partial_callback: Callable[[str, bool], None] | None = None):
         """Start listening with thread safety"""
         with self._lock:
             if self._listening:
@@ -69,9 +78,10 @@ class VoiceEngine:
             
         try:
             if duration:
-                self._engine.start_listening(callback=callback, duration=duration)
+                self._engine.start_listening(callback=callback, duration=duration,
+                                             partial_callback=partial_callback)
             else:
-                self._engine.start_listening(callback=callback)
+                self._engine.start_listening(callback=callback, partial_callback=partial_callback)
         except Exception as e:
             logger.error(f"Error starting listening for {self.language}: {e}")
             with self._lock:
@@ -98,8 +108,15 @@ class VoiceEngine:
     
     @property
     def is_listening(self) -> bool:
-        with self._lock:
-            return self._listening
+        # Single bool read is atomic; the lock only guards check-and-set above
+        return self._listening
+
+def _index_by_first_word(commands: dict[str, str]) -> dict[str, tuple]:
+    """Group (voice_cmd, real_cmd) pairs by first word, keeping declaration order"""
+    index: dict[str, list] = {}
+    for voice_cmd, real_cmd in commands.items():
+        index.setdefault(voice_cmd.partition(" ")[0], []).append((voice_cmd, real_cmd))
+    return {head: tuple(pairs) for head, pairs in index.items()}
 
 class TextCorrector:
     """Text correction for different contexts"""
@@ -120,6 +137,10 @@ class TextCorrector:
         "git status": "git status", "stato git": "git status",
     }
     
+    # Lookup tables built once at import so the per-result path never walks dicts
+    _IT_TECH_PAIRS = tuple(IT_TECH_TERMS.items())
+    _LINUX_INDEX = _index_by_first_word(LINUX_COMMANDS)
+
     @classmethod
     def correct_text(cls, text: str, context: str = "browser") -> tuple[str, bool]:
         """Correct text based on context"""
@@ -130,11 +151,13 @@ class TextCorrector:
         corrected = text.lower()
         
         if context == "browser":
-            for wrong, correct in cls.IT_TECH_TERMS.items():
+            for wrong, correct in cls._IT_TECH_PAIRS:
                 if wrong in corrected:
                     corrected = corrected.replace(wrong, correct)
         elif context == "terminal":
-            for voice_cmd, real_cmd in cls.LINUX_COMMANDS.items():
+            # Only commands sharing the first spoken word can match
+            candidates = cls._LINUX_INDEX.get(corrected.partition(" ")[0], ())
+            for voice_cmd, real_cmd in candidates:
                 if corrected == voice_cmd or corrected.startswith(voice_cmd + " "):
                     remainder = corrected[len(voice_cmd):].strip()
                     corrected = real_cmd + (" " + remainder if remainder else "")
@@ -162,6 +185,7 @@ class VoiceServer:
         self._shutdown_event = asyncio.Event()
         self._listening_thread: Optional[threading.Thread] = None
         self._main_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._broadcast_slots = threading.Semaphore(MAX_PENDING_BROADCASTS)
         
         # Load engines
         self._load_engines()
@@ -281,17 +305,28 @@ class VoiceServer:
                     original_text=text if was_corrected else None,
                     context="browser"
                 )
-                # Thread-safe way to schedule coroutine in the main event loop
                 try:
-                    if self._main_loop:
-                        asyncio.run_coroutine_threadsafe(self._broadcast_result(result), self._main_loop)
+                    self._schedule_broadcast(self._result_message(result))
                 except Exception as e:
                     logger.error(f"Error broadcasting result: {e}")
         
+        def partial_callback(delta: str, reset: bool):
+            # Clients append delta to the pending text, or replace it when reset
+            message = {
+                "type": "speech_partial",
+                "delta": delta,
+                "reset": reset,
+                "language": self.current_language
+            }
+            try:
+                self._schedule_broadcast(message)
+            except Exception as e:
+                logger.error(f"Error broadcasting partial result: {e}")
+
         try:
             # Start listening in a separate thread to avoid blocking
             def start_listening():
-                engine.start_listening(voice_callback)
+                engine.start_listening(voice_callback, partial_callback=partial_callback)
             
             self._listening_thread = threading.Thread(target=start_listening, daemon=True)
             self._listening_thread.start()
@@ -420,8 +455,9 @@ class VoiceServer:
         }
         await websocket.send(json.dumps(status))
     
-    async def _send_result(self, websocket: websockets.WebSocketServerProtocol, result: VoiceResult):
-        """Send voice result to client"""
+    @staticmethod
+    def _result_message(result: VoiceResult) -> dict:
+        """Build the speech_result payload for a voice result"""
         message = {
             "type": "speech_result",
             "text": result.text,
@@ -431,8 +467,11 @@ class VoiceServer:
         }
         if result.original_text:
             message["original_text"] = result.original_text
-        
-        await websocket.send(json.dumps(message))
+        return message
+
+    async def _send_result(self, websocket: websockets.WebSocketServerProtocol, result: VoiceResult):
+        """Send voice result to client"""
+        await websocket.send(json.dumps(self._result_message(result)))
     
     async def _send_error(self, websocket: websockets.WebSocketServerProtocol, error: str):
         """Send error message to client"""
@@ -440,32 +479,36 @@ class VoiceServer:
     
     async def _broadcast_result(self, result: VoiceResult):
         """Broadcast result to all connected clients"""
+        await self._broadcast_message(self._result_message(result))
+
+    def _schedule_broadcast(self, message: dict):
+        """Schedule a broadcast from a recognition thread, dropping it when backlogged"""
+        if not self._main_loop:
+            return
+        if not self._broadcast_slots.acquire(blocking=False):
+            logger.warning("Broadcast backlog full, dropping message")
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._release_after_broadcast(message), self._main_loop)
+        except Exception:
+            self._broadcast_slots.release()
+            raise
+
+    async def _release_after_broadcast(self, message: dict):
+        """Broadcast a scheduled message and free its backlog slot"""
+        try:
+            await self._broadcast_message(message)
+        finally:
+            self._broadcast_slots.release()
+
+    async def _broadcast_message(self, message: dict):
+        """Broadcast a JSON message to all connected clients"""
         if not self.clients:
             return
         
-        message = {
-            "type": "speech_result",
-            "text": result.text,
-            "confidence": result.confidence,
-            "language": result.language,
-            "context": result.context
-        }
-        if result.original_text:
-            message["original_text"] = result.original_text
-        
-        message_json = json.dumps(message)
-        disconnected = set()
-        
-        for client in self.clients.copy():
-            try:
-                await client.send(message_json)
-            except ConnectionClosed:
-                disconnected.add(client)
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
-                disconnected.add(client)
-        
-        self.clients.difference_update(disconnected)
+        # Frame the payload once and write it to every open connection;
+        # closed clients are skipped and removed by handle_client on exit
+        websockets.broadcast(self.clients, json.dumps(message))
     
     async def shutdown(self):
         """Gracefully shutdown the server"""
@@ -589,7 +632,7 @@ def main():
             ssl_cert=ssl_cert,
             ssl_key=ssl_key
         )
-        asyncio.run(server.run())
+        run(server.run())
     except KeyboardInterrupt:
         logger.info("👋 Server stopped by user")
     except Exception as e:
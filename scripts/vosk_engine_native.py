@@ -4,22 +4,109 @@ Vosk Engine with Native Audio Capture - Shows mic icon in system tray
 """
 
 import json
-import queue
+import re
 import sys
+import threading
 import time
+from collections import deque
 from pathlib import Path
 
+import numpy as np
 import vosk
 from native_audio_capture import NativeAudioCapture
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson opzionale
+    json_loads = json.loads
+
+# Campo "text" senza escape: lo schema di Vosk e' fisso
+_TEXT_RE = re.compile(r'"text"\s*:\s*"([^"\\]*)"')
+
+
+def extract_text(result: str) -> tuple[str, float]:
+    """Testo e confidence da un Result() di Vosk, evitando il parse completo"""
+    if '"confidence"' not in result:
+        match = _TEXT_RE.search(result)
+        if match:
+            return match.group(1).strip(), 0
+    parsed = json_loads(result)
+    return parsed.get("text", "").strip(), parsed.get("confidence", 0)
+
+
+def pcm16_rms(data: bytes) -> float:
+    """RMS of a signed 16-bit PCM chunk, computed without copying the buffer"""
+    pcm = np.frombuffer(data, dtype=np.int16)
+    if pcm.size == 0:
+        return 0.0
+    # int64 accumulator: np.dot on int16 overflows silently
+    energy = np.einsum("i,i->", pcm, pcm, dtype=np.int64)
+    return float(np.sqrt(energy / pcm.size))
+
+
+class _ChunkQueue:
+    """FIFO di chunk audio single-producer/single-consumer
+
+    Il deque limitato e' un ring buffer in C con append/popleft atomici: il
+    thread di cattura non passa dal mutex/Condition di queue.Queue e, se il
+    consumer resta indietro, i chunk piu' vecchi vengono scartati.
+    """
+
+    def __init__(self, max_chunks=256):
+        self._chunks = deque(maxlen=max_chunks)
+        self._ready = threading.Event()
+
+    def put(self, chunk):
+        self._chunks.append(chunk)
+        self._ready.set()
+
+    def get(self, timeout):
+        """Chunk piu' vecchio, o None se non arriva nulla entro timeout"""
+        try:
+            return self._chunks.popleft()
+        except IndexError:
+            pass
+        # Clear before re-checking so a put() in between is never missed
+        self._ready.clear()
+        if not self._chunks and not self._ready.wait(timeout):
+            return None
+        try:
+            return self._chunks.popleft()
+        except IndexError:
+            return None
+
+    def get_batch(self, timeout, max_chunks=8):
+        """Come get(), ma accoda fino a max_chunks chunk gia' disponibili"""
+        first = self.get(timeout)
+        if first is None or not self._chunks:
+            return first
+        batch = [first]
+        popleft = self._chunks.popleft
+        try:
+            while len(batch) < max_chunks:
+                batch.append(popleft())
+        except IndexError:
+            pass
+        return b"".join(batch)
+
+    def clear(self):
+        self._chunks.clear()
+        self._ready.clear()
+
 
 class VoskEngineNative:
     """Vosk engine using native audio capture that shows mic icon in tray"""
     
-    def __init__(self, model_path, sample_rate=16000, verbose=False):
+    def __init__(self, model_path, sample_rate=16000, verbose=False,
+                 silence_threshold=0, silence_hangover=1.0):
         self.sample_rate = sample_rate
         self.verbose = verbose
-        self.q = queue.Queue()
+        # Gate di silenzio: chunk con RMS sotto soglia non vanno a Vosk (0 = off).
+        # Dopo il parlato si inviano ancora silence_hangover secondi, cosi' Vosk
+        # vede il silenzio finale che gli serve per chiudere la frase.
+        self.silence_threshold = silence_threshold
+        self.silence_hangover = silence_hangover
+        self.q = _ChunkQueue()
         self.is_listening = False
         self.native_capture = None  # Create fresh for each capture session
 
@@ -37,12 +124,26 @@ class VoskEngineNative:
         self.rec.SetWords(True)
         print("✅ Modello caricato")
 
-    def start_listening(self, callback=None, duration=None):
+    def start_listening(self, callback=None, duration=None, partial_callback=None):
         """
         Avvia listening con native capture (mostra icona microfono)
+
+        L'istanza e' pensata per essere riusata tra sessioni: il modello resta
+        caricato e il recognizer viene azzerato all'inizio di ogni sessione.
+
+        partial_callback(delta, reset): riceve solo la parte nuova del parziale;
+        reset=True quando Vosk ha riscritto il parziale e delta lo sostituisce
         """
         self.is_listening = True
         start_time = time.time()
+        last_partial = ""
+
+        # Niente parziali della sessione precedente, senza ricaricare il modello
+        try:
+            self.rec.Reset()
+        except AttributeError:  # vosk senza Reset()
+            self.rec = vosk.KaldiRecognizer(self.model, self.sample_rate)
+            self.rec.SetWords(True)
 
         try:
             print(f"🎤 Using NATIVE audio capture (shows tray icon)")
@@ -52,11 +153,7 @@ class VoskEngineNative:
             self.native_capture = NativeAudioCapture(self.sample_rate)
             
             # Clear queue for fresh start
-            while not self.q.empty():
-                try:
-                    self.q.get_nowait()
-                except queue.Empty:
-                    break
+            self.q.clear()
             
             # Native capture callback
             def native_audio_callback(audio_data: bytes):
@@ -73,37 +170,65 @@ class VoskEngineNative:
             if duration:
                 print(f"⏱️  Durata: {duration} secondi")
 
+            # Bind hot-loop lookups once instead of resolving them per chunk
+            get_batch = self.q.get_batch
+            accept_waveform = self.rec.AcceptWaveform
+            loads = json_loads
+            deadline = start_time + duration if duration else None
+            threshold = self.silence_threshold
+            hangover_bytes = int(self.silence_hangover * self.sample_rate * 2)
+            hangover = 0
+            preroll = None
+
             # Process audio data from queue
             while self.is_listening:
                 # Check duration
-                if duration and (time.time() - start_time) > duration:
+                if deadline and time.time() > deadline:
                     break
 
-                try:
-                    data = self.q.get(timeout=0.1)
+                # Backlogged chunks go to Vosk in one call
+                data = get_batch(0.1)
+                if data is None:
+                    continue
 
-                    if self.rec.AcceptWaveform(data):
-                        result = json.loads(self.rec.Result())
-                        text = result.get("text", "").strip()
+                if threshold:
+                    if pcm16_rms(data) >= threshold:
+                        hangover = hangover_bytes
+                        if preroll:
+                            # L'ultimo chunk scartato contiene l'attacco della parola
+                            data = preroll + data
+                            preroll = None
+                    elif hangover > 0:
+                        hangover -= len(data)
+                    else:
+                        preroll = data
+                        continue
 
-                        if text:
-                            confidence = result.get("confidence", 0)
-                            if self.verbose:
-                                print(f"📝 [{confidence:.2f}] {text}")
+                if accept_waveform(data):
+                    last_partial = ""
+                    text, confidence = extract_text(self.rec.Result())
 
-                            if callback:
-                                callback(text, confidence)
-                            else:
-                                print(f"🗣️  {text}")
-                    else:
-                        # Check partial results
-                        partial = json.loads(self.rec.PartialResult())
-                        partial_text = partial.get("partial", "")
-                        if partial_text and self.verbose:
-                            print(f"🔍 Partial: '{partial_text}'")
+                    if text:
+                        if self.verbose:
+                            print(f"📝 [{confidence:.2f}] {text}")
 
-                except queue.Empty:
-                    continue
+                        if callback:
+                            callback(text, confidence)
+                        else:
+                            print(f"🗣️  {text}")
+                elif self.verbose or partial_callback:
+                    # Partials are only parsed when someone consumes them
+                    partial = loads(self.rec.PartialResult())
+                    partial_text = partial.get("partial", "")
+                    if partial_text and self.verbose:
+                        print(f"🔍 Partial: '{partial_text}'")
+
+                    if partial_callback and partial_text != last_partial:
+                        if partial_text.startswith(last_partial):
+                            partial_callback(partial_text[len(last_partial):], False)
+                        else:
+                            partial_callback(partial_text, True)
+                        last_partial = partial_text
             
             # Wait for capture thread to finish
             if capture_thread:
@@ -120,8 +245,7 @@ class VoskEngineNative:
 
             # Final result se disponibile
             try:
-                final_result = json.loads(self.rec.FinalResult())
-                final_text = final_result.get("text", "").strip()
+                final_text, _ = extract_text(self.rec.FinalResult())
                 if final_text:
                     print(f"🎯 Final: {final_text}")
             except:
@@ -147,12 +271,22 @@ def main():
     )
     parser.add_argument("--duration", type=int, help="Durata ascolto in secondi")
     parser.add_argument("--verbose", action="store_true", help="Output dettagliato")
+    parser.add_argument(
+        "--silence-threshold",
+        type=float,
+        default=0,
+        help="RMS minimo (int16) per inviare audio a Vosk, 0 = disattivato",
+    )
 
     args = parser.parse_args()
 
     try:
         print("🎤 Testing NATIVE Vosk Engine (with tray icon)")
-        engine = VoskEngineNative(args.model, verbose=args.verbose)
+        engine = VoskEngineNative(
+            args.model,
+            verbose=args.verbose,
+            silence_threshold=args.silence_threshold,
+        )
         engine.start_listening(duration=args.duration)
     except Exception as e:
         print(f"❌ Errore inizializzazione: {e}")
@@ -1,9 +1,16 @@
 """Async client for Claude Code integration."""
 
 import asyncio
+import functools
 import json
 import logging
+import os
+import shutil
+import string
 import subprocess
+import time
+from collections import Counter
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any, Optional
 
@@ -12,10 +19,111 @@ import websockets
 from ..config import settings
 from ..exceptions import WebSocketError
 from ..logging_config import setup_logging
+from ..runtime import run
+from ..serialization import dumps, loads
 
-# Setup logging
 logger = logging.getLogger(__name__)
-setup_logging()
+
+# Logging is configured by the first client, not as an import side effect
+_logging_configured = False
+
+# Serialized once: every status poll sends the same request
+_STATUS_REQUEST = dumps({"action": "get_status"})
+
+# File extensions used to determine the primary language of a project
+LANGUAGE_BY_EXTENSION = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.java': 'java',
+    '.cpp': 'cpp',
+    '.c': 'c',
+    '.rb': 'ruby',
+    '.php': 'php'
+}
+
+# Seconds a git context snapshot is reused before git is queried again
+GIT_CONTEXT_TTL = 2.0
+
+# Seconds a detected development context is reused across template expansions
+CONTEXT_TTL = 5.0
+
+_CONVERSIONS = {"r": repr, "s": str, "a": ascii}
+
+# Context keys produced by each detection step
+_GIT_FIELDS = frozenset({"git_branch", "git_changes"})
+_FILE_FIELDS = frozenset({"primary_language", "file_counts"})
+_PROJECT_FIELDS = frozenset({"project_type"})
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_template(template: str) -> tuple[tuple[str, str | None, str, str | None], ...]:
+    """Split a format string into (literal, field, spec, conversion) parts once."""
+    return tuple(string.Formatter().parse(template))
+
+
+def _template_fields(template: str) -> frozenset[str]:
+    """Names of the fields a template references."""
+    return frozenset(
+        field for _, field, _, _ in _parse_template(template) if field is not None
+    )
+
+
+# Resolved claude-code executable; stays unset until a lookup succeeds
+_claude_code_path: str | None = None
+
+
+def _find_claude_code() -> str | None:
+    """Resolve the claude-code executable once it is found, not per spawn."""
+    global _claude_code_path
+    if _claude_code_path is None:
+        # A miss is not cached: the CLI may be installed while we run
+        _claude_code_path = shutil.which("claude-code")
+    return _claude_code_path
+
+
+def _render_template(template: str, values: dict[str, Any]) -> str:
+    """Fill a template from pre-parsed parts; missing fields raise KeyError."""
+    parts = []
+    for literal, field, spec, conversion in _parse_template(template):
+        parts.append(literal)
+        if field is None:
+            continue
+        if not field.isidentifier() or "{" in spec:
+            # Attribute/index lookups, auto-numbering and nested specs need
+            # the full str.format machinery
+            return template.format(**values)
+        value = values[field]
+        if conversion:
+            value = _CONVERSIONS[conversion](value)
+        parts.append(format(value, spec) if spec else str(value))
+    return "".join(parts)
+
+
+# Dependency, cache and build output directories that say nothing about the project
+_SKIP_DIRS = frozenset({
+    "node_modules", "__pycache__", "target", "dist", "build", "venv"
+})
+
+
+def _walk_non_hidden(root: Path) -> Iterator[os.DirEntry]:
+    """Yield files under root, never descending into hidden or generated directories."""
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP_DIRS:
+                            stack.append(entry.path)
+                    elif entry.is_file():
+                        yield entry
+        except OSError:
+            continue
 
 
 class ClaudeVoiceClient:
@@ -23,9 +131,18 @@ class ClaudeVoiceClient:
 
     def __init__(self, server_host: Optional[str] = None, server_port: Optional[int] = None) -> None:
         """Initialize the Claude voice client."""
+        global _logging_configured
+        if not _logging_configured:
+            setup_logging()
+            _logging_configured = True
+
         self.server_host = server_host or settings.websocket.host
         self.server_port = server_port or settings.websocket.port
         self.websocket: Optional[Any] = None
+        self._git_cache: dict[Path, tuple[float, dict[str, str]]] = {}
+        self._context_cache: dict[
+            tuple[Path, frozenset[str] | None], tuple[float, dict[str, str]]
+        ] = {}
 
         # Prompt templates for common development tasks
         self.prompt_templates = {
@@ -87,13 +204,13 @@ class ClaudeVoiceClient:
         }
 
         try:
-            await self.websocket.send(json.dumps(request))
+            await self.websocket.send(dumps(request))
             response = await asyncio.wait_for(
                 self.websocket.recv(),
                 timeout=timeout + 5  # Add buffer for server processing
             )
 
-            data = json.loads(response)
+            data = loads(response)
 
             if data.get("type") == "error":
                 raise WebSocketError(f"Voice capture error: {data.get('message')}")
@@ -120,9 +237,9 @@ class ClaudeVoiceClient:
             "language": language
         }
 
-        await self.websocket.send(json.dumps(request))
+        await self.websocket.send(dumps(request))
         response = await self.websocket.recv()
-        data = json.loads(response)
+        data = loads(response)
 
         if data.get("type") == "error":
             raise WebSocketError(f"Language change error: {data.get('message')}")
@@ -132,102 +249,139 @@ class ClaudeVoiceClient:
         if not self.websocket:
             await self.connect()
 
-        request = {"action": "get_status"}
-
-        await self.websocket.send(json.dumps(request))
+        await self.websocket.send(_STATUS_REQUEST)
         response = await self.websocket.recv()
-        return json.loads(response)
+        return loads(response)
 
-    def detect_current_context(self) -> dict[str, str]:
+    def detect_current_context(
+        self, fields: frozenset[str] | None = None
+    ) -> dict[str, str]:
         """
         Detect current development context.
         
+        Args:
+            fields: Context keys the caller needs; detection steps producing
+                none of them are skipped (all keys if None)
+
         Returns:
             Dictionary with context information
         """
-        context = {}
         current_dir = Path.cwd()
+        now = time.monotonic()
+        cache_key = (current_dir, fields)
+        cached = self._context_cache.get(cache_key)
+        if cached and now - cached[0] < CONTEXT_TTL:
+            return dict(cached[1])
+
+        context = {}
 
         # Git information
-        context.update(self._get_git_context(current_dir))
+        if fields is None or fields & _GIT_FIELDS:
+            context.update(self._get_git_context(current_dir))
 
         # File type detection
-        context.update(self._get_file_context(current_dir))
+        if fields is None or fields & _FILE_FIELDS:
+            context.update(self._get_file_context(
+                current_dir, with_counts=fields is None or "file_counts" in fields
+            ))
 
         # Project type detection
-        context.update(self._get_project_context(current_dir))
+        if fields is None or fields & _PROJECT_FIELDS:
+            context.update(self._get_project_context(current_dir))
 
-        return context
+        self._context_cache[cache_key] = (now, context)
+        return dict(context)
 
     def _get_git_context(self, directory: Path) -> dict[str, str]:
-        """Get Git context information."""
+        """Get Git context information, reusing it for GIT_CONTEXT_TTL seconds."""
+        now = time.monotonic()
+        cached = self._git_cache.get(directory)
+        if cached and now - cached[0] < GIT_CONTEXT_TTL:
+            return dict(cached[1])
+
         context = {}
 
         try:
-            # Get current branch
-            result = subprocess.run(
-                ["git", "branch", "--show-current"],
-                cwd=directory,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            context["git_branch"] = result.stdout.strip()
-
-            # Get repository status
+            # Branch and working tree status in a single git invocation
             result = subprocess.run(
-                ["git", "status", "--porcelain"],
+                ["git", "status", "--porcelain=v2", "--branch"],
                 cwd=directory,
                 capture_output=True,
                 text=True,
                 check=True
             )
-            context["git_changes"] = str(len(result.stdout.strip().split('\n')) if result.stdout.strip() else 0)
+            branch = ""
+            changes = 0
+            for line in result.stdout.splitlines():
+                if line.startswith("# branch.head "):
+                    branch = line[len("# branch.head "):]
+                elif not line.startswith("#"):
+                    changes += 1
+            context["git_branch"] = "" if branch == "(detached)" else branch
+            context["git_changes"] = str(changes)
 
         except (subprocess.CalledProcessError, FileNotFoundError):
             context["git_branch"] = "not-git-repo"
             context["git_changes"] = "0"
 
-        return context
+        self._git_cache[directory] = (now, context)
+        return dict(context)
 
-    def _get_file_context(self, directory: Path) -> dict[str, str]:
+    def _get_file_context(
+        self, directory: Path, with_counts: bool = True
+    ) -> dict[str, str]:
         """Get file context information."""
         context = {}
 
-        # Count files by extension
-        file_counts: dict[str, int] = {}
-        for file_path in directory.rglob("*"):
-            if file_path.is_file() and not any(
-                part.startswith('.') for part in file_path.parts
-            ):
-                ext = file_path.suffix.lower()
-                file_counts[ext] = file_counts.get(ext, 0) + 1
-
-        # Determine primary language
-        language_mapping = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.java': 'java',
-            '.cpp': 'cpp',
-            '.c': 'c',
-            '.rb': 'ruby',
-            '.php': 'php'
-        }
+        if with_counts:
+            file_counts = self._file_counts(directory)
+            context["primary_language"] = self._primary_language(file_counts)
+            context["file_counts"] = str(dict(file_counts))
+        else:
+            context["primary_language"] = self._primary_language_sampled(
+                directory, settings.server.language_sample_size
+            )
 
+        return context
+
+    def _file_counts(self, directory: Path) -> Counter[str]:
+        """Count files by extension, pruning hidden and generated trees."""
+        return Counter(
+            os.path.splitext(entry.name)[1].lower()
+            for entry in _walk_non_hidden(directory)
+        )
+
+    def _primary_language_sampled(self, directory: Path, sample: int) -> str:
+        """
+        Primary language from the first `sample` files of the walk.
+
+        The walk stops early once one language holds at least half of the
+        source files seen; otherwise it continues over the whole tree.
+        """
+        language_counts: Counter[str] = Counter()
+        seen = 0
+        for entry in _walk_non_hidden(directory):
+            ext = os.path.splitext(entry.name)[1].lower()
+            if ext in LANGUAGE_BY_EXTENSION:
+                language_counts[ext] += 1
+            seen += 1
+            if sample and seen >= sample and language_counts:
+                top = language_counts.most_common(1)[0][1]
+                if top * 2 >= language_counts.total():
+                    break
+        return self._primary_language(language_counts)
+
+    def _primary_language(self, file_counts: Counter[str]) -> str:
+        """Language with the most source files, or "unknown"."""
         max_count = 0
         primary_language = "unknown"
-        for ext, count in file_counts.items():
-            if ext in language_mapping and count > max_count:
+        for ext, language in LANGUAGE_BY_EXTENSION.items():
+            count = file_counts.get(ext, 0)
+            if count > max_count:
                 max_count = count
-                primary_language = language_mapping[ext]
+                primary_language = language
 
-        context["primary_language"] = primary_language
-        context["file_counts"] = str(file_counts)
-
-        return context
+        return primary_language
 
     def _get_project_context(self, directory: Path) -> dict[str, str]:
         """Get project context information."""
@@ -246,8 +400,15 @@ class ClaudeVoiceClient:
             "composer.json": "php"
         }
 
+        # One directory listing instead of a stat per indicator
+        try:
+            with os.scandir(directory) as entries:
+                names = frozenset(entry.name for entry in entries)
+        except OSError:
+            names = frozenset()
+
         for filename, project_type in project_indicators.items():
-            if (directory / filename).exists():
+            if filename in names:
                 context["project_type"] = project_type
                 break
         else:
@@ -270,12 +431,12 @@ class ClaudeVoiceClient:
         if not template:
             return f"Unknown template: {template_name}"
 
-        # Add context information
-        context_info = self.detect_current_context()
+        # Add context information, detecting only what the template uses
+        context_info = self.detect_current_context(_template_fields(template))
         kwargs.update(context_info)
 
         try:
-            return template.format(**kwargs)
+            return _render_template(template, kwargs)
         except KeyError as e:
             return f"Template error - missing variable: {e}"
 
@@ -290,7 +451,11 @@ class ClaudeVoiceClient:
         Returns:
             Claude Code output
         """
-        cmd = ["claude-code"]
+        executable = _find_claude_code()
+        if executable is None:
+            return "Error: claude-code command not found"
+
+        cmd = [executable]
         if not interactive:
             cmd.append("--no-interactive")
         cmd.append(prompt)
@@ -374,4 +539,4 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
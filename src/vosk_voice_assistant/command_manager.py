@@ -2,14 +2,26 @@
 
 import json
 import os
+import re
+import threading
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
+from .config import home_dir
 from .exceptions import ConfigurationError
 from .logging_config import get_logger
+from .serialization import loads
 
 logger = get_logger(__name__)
 
+# Parsed configuration files keyed by (path, mtime_ns, size)
+_CONFIG_CACHE: dict[tuple[str, int, int], dict[str, Any]] = {}
+
+# {HOME} placeholder, $VAR and ${VAR} references in directory paths
+_ENV_VAR_RE = re.compile(r"\{HOME\}|\$(\w+)|\$\{(\w+)\}")
+
 
 class CommandManager:
     """
@@ -19,6 +31,26 @@ class CommandManager:
     safe command execution with environment variable substitution.
     """
 
+    __slots__ = (
+        "config_path",
+        "commands",
+        "allowed_directories",
+        "search_settings",
+        "security_settings",
+        "_allowed_directories_view",
+        "_descriptions",
+        "_safe_commands",
+        "_dangerous_chars",
+        "_allowed_extensions",
+        "_forbidden_paths",
+        "_allowed_extension_set",
+        "_max_input_length",
+        "_command_timeout",
+        "_max_query_length",
+        "_dangerous_pattern",
+        "_dangerous_table",
+    )
+
     def __init__(self, config_path: Path | None = None) -> None:
         """
         Initialize command manager.
@@ -34,8 +66,22 @@ class CommandManager:
         self.config_path = config_path
         self.commands: dict[str, Any] = {}
         self.allowed_directories: dict[str, str] = {}
+        self._allowed_directories_view: Mapping[str, str] = MappingProxyType(
+            self.allowed_directories
+        )
         self.search_settings: dict[str, Any] = {}
         self.security_settings: dict[str, Any] = {}
+        self._descriptions: dict[str, str] = {}
+        self._safe_commands: dict[str, list[str]] | None = None
+        self._dangerous_chars: tuple[str, ...] = ()
+        self._allowed_extensions: tuple[str, ...] = ()
+        self._forbidden_paths: tuple[str, ...] = ()
+        self._allowed_extension_set: frozenset[str] = frozenset()
+        self._max_input_length = 100
+        self._command_timeout = 10
+        self._max_query_length = 50
+        self._dangerous_pattern: re.Pattern[str] | None = None
+        self._dangerous_table: dict[int, None] | None = None
 
         self._load_configuration()
         logger.info("CommandManager initialized with %d commands", len(self.commands))
@@ -43,41 +89,96 @@ class CommandManager:
     def _load_configuration(self) -> None:
         """Load configuration from JSON file."""
         try:
-            if not self.config_path.exists():
+            try:
+                stat = self.config_path.stat()
+            except FileNotFoundError:
                 raise ConfigurationError(
                     f"Configuration file not found: {self.config_path}"
-                )
-
-            with open(self.config_path, encoding="utf-8") as f:
-                config = json.load(f)
-
-            self.commands = config.get("voice_commands", {})
-            self.allowed_directories = config.get("allowed_directories", {})
+                ) from None
+
+            # Unchanged files are parsed once per process
+            cache_key = (str(self.config_path), stat.st_mtime_ns, stat.st_size)
+            config = _CONFIG_CACHE.get(cache_key)
+            if config is None:
+                # orjson (when installed) parses straight from bytes
+                config = loads(self.config_path.read_bytes())
+                for stale in [k for k in _CONFIG_CACHE if k[0] == cache_key[0]]:
+                    del _CONFIG_CACHE[stale]
+                _CONFIG_CACHE[cache_key] = config
+
+            # Copy the sections this instance mutates, share the rest
+            self.commands = dict(config.get("voice_commands", {}))
+            self.allowed_directories = dict(config.get("allowed_directories", {}))
             self.search_settings = config.get("search_settings", {})
             self.security_settings = config.get("security_settings", {})
+            self._safe_commands = None
+            self._descriptions = {
+                name: str(config["description"])
+                for name, config in self.commands.items()
+                if config.get("description") is not None
+            }
 
             # Expand environment variables in directory paths
             self._expand_environment_variables()
+            self._allowed_directories_view = MappingProxyType(self.allowed_directories)
+            self._normalize_settings()
 
             logger.info("Configuration loaded successfully from %s", self.config_path)
 
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError; stdlib
+            # json.loads(bytes) reports bad encodings as UnicodeDecodeError
             raise ConfigurationError(f"Invalid JSON in configuration file: {e}") from e
         except Exception as e:
             raise ConfigurationError(f"Failed to load configuration: {e}") from e
 
     def _expand_environment_variables(self) -> None:
         """Expand environment variables in directory paths."""
-        for key, path in self.allowed_directories.items():
-            # Replace {HOME} with actual home directory
-            if "{HOME}" in path:
-                path = path.replace("{HOME}", str(Path.home()))
+        home = home_dir()
 
-            # Expand other environment variables
-            path = os.path.expandvars(path)
+        def replace(match: re.Match[str]) -> str:
+            name = match.group(1) or match.group(2)
+            if name is None:
+                return home
+            # Unknown variables are left untouched, like os.path.expandvars
+            return os.environ.get(name, match.group(0))
 
+        for key, path in self.allowed_directories.items():
+            # Literal paths, the common case, skip the regex entirely
+            if "$" in path or "{HOME}" in path:
+                path = _ENV_VAR_RE.sub(replace, path)
+            if path.startswith("~"):
+                path = os.path.expanduser(path)
             self.allowed_directories[key] = path
 
+    def _normalize_settings(self) -> None:
+        """Convert settings to their final types once instead of on every getter call."""
+        self._dangerous_chars = tuple(
+            str(char) for char in self.security_settings.get("dangerous_chars") or ()
+        )
+        self._allowed_extensions = tuple(
+            str(ext) for ext in self.search_settings.get("allowed_extensions") or ()
+        )
+        self._forbidden_paths = tuple(
+            str(path) for path in self.search_settings.get("forbidden_paths") or ()
+        )
+        self._allowed_extension_set = frozenset(self._allowed_extensions)
+        self._dangerous_pattern = None
+        # str.translate deletion table, usable only for single-character tokens
+        if all(len(char) == 1 for char in self._dangerous_chars):
+            self._dangerous_table = str.maketrans(
+                "", "", "".join(self._dangerous_chars)
+            )
+        else:
+            self._dangerous_table = None
+
+        length = self.security_settings.get("max_input_length", 100)
+        self._max_input_length = int(length) if length is not None else 100
+        timeout = self.security_settings.get("command_timeout", 10)
+        self._command_timeout = int(timeout) if timeout is not None else 10
+        length = self.search_settings.get("max_query_length", 50)
+        self._max_query_length = int(length) if length is not None else 50
+
     def get_safe_commands(self) -> dict[str, list[str]]:
         """
         Get all safe commands as command name -> command list mapping.
@@ -85,12 +186,17 @@ class CommandManager:
         Returns:
             Dictionary of safe commands
         """
-        safe_commands = {}
-        for name, config in self.commands.items():
-            if config.get("safe", False):
-                safe_commands[name] = config["command"]
-
-        return safe_commands
+        return dict(self._get_safe_commands())
+
+    def _get_safe_commands(self) -> dict[str, list[str]]:
+        """Safe command mapping, rebuilt only after the commands change."""
+        if self._safe_commands is None:
+            self._safe_commands = {
+                name: config["command"]
+                for name, config in self.commands.items()
+                if config.get("safe", False)
+            }
+        return self._safe_commands
 
     def get_command_description(self, command_name: str) -> str | None:
         """
@@ -102,10 +208,7 @@ class CommandManager:
         Returns:
             Command description or None if not found
         """
-        if command_name in self.commands:
-            description = self.commands[command_name].get("description")
-            return str(description) if description is not None else None
-        return None
+        return self._descriptions.get(command_name)
 
     def is_safe_command(self, command_name: str) -> bool:
         """
@@ -117,15 +220,21 @@ class CommandManager:
         Returns:
             True if command is safe, False otherwise
         """
-        if command_name in self.commands:
-            safe_value = self.commands[command_name].get("safe", False)
-            return bool(safe_value)
-        return False
+        return command_name in self._get_safe_commands()
 
-    def get_allowed_directories(self) -> dict[str, str]:
+    def get_allowed_directories(self) -> Mapping[str, str]:
         """
         Get allowed directories with expanded paths.
 
+        Returns:
+            Read-only view of directory name -> path mappings
+        """
+        return self._allowed_directories_view
+
+    def get_allowed_directories_copy(self) -> dict[str, str]:
+        """
+        Get a mutable copy of the allowed directories.
+
         Returns:
             Dictionary of directory name -> path mappings
         """
@@ -138,8 +247,55 @@ class CommandManager:
         Returns:
             List of dangerous characters
         """
-        chars = self.security_settings.get("dangerous_chars", [])
-        return [str(char) for char in chars] if chars else []
+        return list(self._dangerous_chars)
+
+    def get_dangerous_char_pattern(self) -> re.Pattern[str]:
+        """
+        Get a compiled pattern matching any dangerous character.
+
+        ``pattern.search(text) is not None`` checks the whole input in a
+        single regex scan instead of one ``in`` test per character.
+
+        Returns:
+            Compiled regular expression
+        """
+        if self._dangerous_pattern is None:
+            if not self._dangerous_chars:
+                # Nothing is dangerous: a pattern that never matches
+                self._dangerous_pattern = re.compile(r"(?!)")
+            else:
+                # Longest first so multi-character tokens win over prefixes
+                tokens = sorted(self._dangerous_chars, key=len, reverse=True)
+                self._dangerous_pattern = re.compile(
+                    "|".join(re.escape(token) for token in tokens)
+                )
+        return self._dangerous_pattern
+
+    def contains_dangerous_characters(self, text: str) -> bool:
+        """
+        Check input for dangerous characters in a single regex scan.
+
+        Args:
+            text: User input
+
+        Returns:
+            True if any dangerous character occurs in text
+        """
+        return self.get_dangerous_char_pattern().search(text) is not None
+
+    def strip_dangerous_characters(self, text: str) -> str:
+        """
+        Remove dangerous characters from input.
+
+        Args:
+            text: User input
+
+        Returns:
+            Text without dangerous characters
+        """
+        if self._dangerous_table is not None:
+            return text.translate(self._dangerous_table)
+        return self.get_dangerous_char_pattern().sub("", text)
 
     def get_max_input_length(self) -> int:
         """
@@ -148,8 +304,7 @@ class CommandManager:
         Returns:
             Maximum input length
         """
-        length = self.security_settings.get("max_input_length", 100)
-        return int(length) if length is not None else 100
+        return self._max_input_length
 
     def get_command_timeout(self) -> int:
         """
@@ -158,8 +313,7 @@ class CommandManager:
         Returns:
             Timeout in seconds
         """
-        timeout = self.security_settings.get("command_timeout", 10)
-        return int(timeout) if timeout is not None else 10
+        return self._command_timeout
 
     def get_max_search_query_length(self) -> int:
         """
@@ -168,8 +322,7 @@ class CommandManager:
         Returns:
             Maximum query length
         """
-        length = self.search_settings.get("max_query_length", 50)
-        return int(length) if length is not None else 50
+        return self._max_query_length
 
     def get_allowed_extensions(self) -> list[str]:
         """
@@ -178,8 +331,19 @@ class CommandManager:
         Returns:
             List of allowed extensions
         """
-        extensions = self.search_settings.get("allowed_extensions", [])
-        return [str(ext) for ext in extensions] if extensions else []
+        return list(self._allowed_extensions)
+
+    def is_allowed_extension(self, extension: str) -> bool:
+        """
+        Check if a file extension is allowed for search.
+
+        Args:
+            extension: Extension including the dot, e.g. ".py"
+
+        Returns:
+            True if the extension is allowed, False otherwise
+        """
+        return extension in self._allowed_extension_set
 
     def get_forbidden_paths(self) -> list[str]:
         """
@@ -188,8 +352,7 @@ class CommandManager:
         Returns:
             List of forbidden paths
         """
-        paths = self.search_settings.get("forbidden_paths", [])
-        return [str(path) for path in paths] if paths else []
+        return list(self._forbidden_paths)
 
     def add_custom_command(
         self, name: str, command: list[str], description: str = "", safe: bool = False
@@ -208,6 +371,8 @@ class CommandManager:
             "description": description,
             "safe": safe,
         }
+        self._descriptions[name] = str(description)
+        self._safe_commands = None
         logger.info("Added custom command: %s", name)
 
     def reload_configuration(self) -> None:
@@ -231,13 +396,12 @@ class CommandManager:
         Returns:
             List of safe command names
         """
-        return [
-            name for name, config in self.commands.items() if config.get("safe", False)
-        ]
+        return list(self._get_safe_commands())
 
 
 # Global command manager instance
 _command_manager: CommandManager | None = None
+_command_manager_lock = threading.Lock()
 
 
 def get_command_manager() -> CommandManager:
@@ -249,5 +413,8 @@ def get_command_manager() -> CommandManager:
     """
     global _command_manager
     if _command_manager is None:
-        _command_manager = CommandManager()
+        # Threads racing on first use must not load the configuration twice
+        with _command_manager_lock:
+            if _command_manager is None:
+                _command_manager = CommandManager()
     return _command_manager
@@ -1,37 +1,62 @@
 """Configuration management for Vosk Voice Assistant."""
 
+import functools
 import os
 from pathlib import Path
+from types import MappingProxyType
 
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
 
+@functools.cache
+def home_dir() -> str:
+    """User home directory, resolved once per process."""
+    return str(Path.home())
+
+
+def _model_path(env_var: str, default_name: str) -> Path:
+    """Model path from env_var, falling back to ~/vosk-env/models/<default_name>."""
+    path = os.getenv(env_var)
+    if path is None:
+        return Path(home_dir(), "vosk-env", "models", default_name)
+    return Path(path)
+
+
 class VoskConfig(BaseModel):
     """Configuration for Vosk engine."""
 
     sample_rate: int = Field(default=16000, description="Audio sample rate in Hz")
     model_paths: dict[str, Path] = Field(
         default_factory=lambda: {
-            "it": Path(
-                os.getenv(
-                    "VOSK_MODEL_IT",
-                    str(Path.home() / "vosk-env" / "models" / "italian"),
-                )
-            ),
-            "en": Path(
-                os.getenv(
-                    "VOSK_MODEL_EN",
-                    str(Path.home() / "vosk-env" / "models" / "english"),
-                )
-            ),
+            "it": _model_path("VOSK_MODEL_IT", "italian"),
+            "en": _model_path("VOSK_MODEL_EN", "english"),
         },
         description="Paths to Vosk models by language",
     )
     verbose: bool = Field(default=False, description="Enable verbose logging")
-    block_size: int = Field(default=8000, description="Audio block size")
+    # Vosk decodes in 200 ms chunks internally: smaller blocks add overhead,
+    # larger ones delay partial and final results
+    block_size: int = Field(
+        default=3200, description="Audio block size (200 ms at 16 kHz)"
+    )
     channels: int = Field(default=1, description="Number of audio channels")
     dtype: str = Field(default="int16", description="Audio data type")
+    word_timestamps: bool = Field(
+        default=False,
+        description="Include per-word timing in Vosk results (larger JSON to parse)",
+    )
+    vad_silence_ms: int | None = Field(
+        default=None,
+        description=(
+            "Trailing silence that ends an utterance; needs a vosk build with "
+            "KaldiRecognizer.SetEndpointerDelays (not in the pinned 0.3.45)"
+        ),
+    )
+    latency: str | float = Field(
+        default="high",
+        description="Input latency: 'low', 'high' or seconds of device buffering",
+    )
 
 
 class WebSocketConfig(BaseModel):
@@ -42,68 +67,78 @@ class WebSocketConfig(BaseModel):
     max_size: int = Field(default=1024 * 1024, description="Maximum message size")
 
 
+# Default correction maps, shared read-only; each config gets its own copy
+_IT_TECH_TERMS = MappingProxyType({
+    "ghit ab": "github",
+    "git ab": "github",
+    "git hub": "github",
+    "docher": "docker",
+    "kubernet": "kubernetes",
+    "react": "react",
+    "nod jes": "nodejs",
+    "javascript": "javascript",
+    "python": "python",
+    "api": "API",
+    "ei pi ai": "API",
+    "rest": "REST",
+})
+
+_LINUX_COMMANDS = MappingProxyType({
+    "elle es": "ls",
+    "liste": "ls",
+    "lista": "ls",
+    "liste la": "ls -la",
+    "ci di": "cd",
+    "vai in": "cd",
+    "pi uadiblu": "pwd",
+    "dove sono": "pwd",
+    "tocca": "touch",
+    "crea file": "touch",
+    "mkdir": "mkdir",
+    "copia": "cp",
+    "sposta": "mv",
+    "rimuovi": "rm",
+    "cat": "cat",
+    "mostra": "cat",
+    "grep": "grep",
+    "pi es": "ps",
+    "processi": "ps aux",
+    "top": "top",
+    "df": "df -h",
+    "spazio disco": "df -h",
+    "free": "free -h",
+    "memoria": "free -h",
+    "ping": "ping",
+    "wget": "wget",
+    "curl": "curl",
+    "git": "git",
+    "git status": "git status",
+    "stato git": "git status",
+    "git add": "git add",
+    "git commit": "git commit",
+    "git push": "git push",
+    "pus": "git push",
+    "docker": "docker",
+    "container": "docker ps",
+    "sudo": "sudo",
+    "installa": "sudo apt install",
+})
+
+
 class TextCorrectionConfig(BaseModel):
-    """Configuration for text correction mappings."""
+    """Configuration for text correction mappings.
+
+    Assign a new dict to change a mapping; compiled patterns are cached per
+    mapping object, so in-place edits are not picked up.
+    """
 
     it_tech_terms: dict[str, str] = Field(
-        default_factory=lambda: {
-            "ghit ab": "github",
-            "git ab": "github",
-            "git hub": "github",
-            "docher": "docker",
-            "kubernet": "kubernetes",
-            "react": "react",
-            "nod jes": "nodejs",
-            "javascript": "javascript",
-            "python": "python",
-            "api": "API",
-            "ei pi ai": "API",
-            "rest": "REST",
-        },
+        default_factory=lambda: dict(_IT_TECH_TERMS),
         description="Italian tech term corrections for browser context",
     )
 
     linux_commands: dict[str, str] = Field(
-        default_factory=lambda: {
-            "elle es": "ls",
-            "liste": "ls",
-            "lista": "ls",
-            "liste la": "ls -la",
-            "ci di": "cd",
-            "vai in": "cd",
-            "pi uadiblu": "pwd",
-            "dove sono": "pwd",
-            "tocca": "touch",
-            "crea file": "touch",
-            "mkdir": "mkdir",
-            "copia": "cp",
-            "sposta": "mv",
-            "rimuovi": "rm",
-            "cat": "cat",
-            "mostra": "cat",
-            "grep": "grep",
-            "pi es": "ps",
-            "processi": "ps aux",
-            "top": "top",
-            "df": "df -h",
-            "spazio disco": "df -h",
-            "free": "free -h",
-            "memoria": "free -h",
-            "ping": "ping",
-            "wget": "wget",
-            "curl": "curl",
-            "git": "git",
-            "git status": "git status",
-            "stato git": "git status",
-            "git add": "git add",
-            "git commit": "git commit",
-            "git push": "git push",
-            "pus": "git push",
-            "docker": "docker",
-            "container": "docker ps",
-            "sudo": "sudo",
-            "installa": "sudo apt install",
-        },
+        default_factory=lambda: dict(_LINUX_COMMANDS),
         description="Linux command corrections for terminal context",
     )
 
@@ -114,6 +149,21 @@ class ServerConfig(BaseModel):
     default_language: str = Field(default="it", description="Default language")
     timeout_seconds: int = Field(default=30, description="Operation timeout in seconds")
     max_clients: int = Field(default=10, description="Maximum concurrent clients")
+    max_concurrent_captures: int = Field(
+        default=1,
+        description=(
+            "Voice captures that can run at the same time; captures on the "
+            "same language engine always run one after another"
+        ),
+    )
+    preload_models: bool = Field(
+        default=True,
+        description="Load every available model at server start instead of on first capture",
+    )
+    language_sample_size: int = Field(
+        default=500,
+        description="Files sampled to detect the primary language (0 walks the whole tree)",
+    )
 
 
 class Settings(BaseSettings):
@@ -135,5 +185,11 @@ class Settings(BaseSettings):
         env_nested_delimiter = "__"
 
 
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the application settings once per process."""
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
@@ -5,12 +5,16 @@ Core speech recognition functionality using Vosk with proper error handling,
 logging, and type safety.
 """
 
-import json
+import functools
 import multiprocessing
-import queue
+import os
+import select
+import threading
 import time
 from collections.abc import Callable
+from multiprocessing.connection import Connection
 from pathlib import Path
+from typing import Any
 
 import sounddevice as sd
 import vosk
@@ -18,45 +22,146 @@ import vosk
 from .config import VoskConfig, settings
 from .exceptions import AudioDeviceError, ModelNotFoundError
 from .logging_config import get_logger
+from .serialization import extract_result, loads
 
 logger = get_logger(__name__)
 
+# Worker protocol on the audio pipe: PCM blocks, or one of these markers.
+# A single byte can never be an int16 PCM block.
+_SHUTDOWN = b""
+_END_SESSION = b"\x00"
+# First message of a session whose caller wants partial results
+_SEND_PARTIALS = b"\x01"
 
-def _vosk_worker_process(model_path: str, sample_rate: int, input_queue: multiprocessing.Queue, output_queue: multiprocessing.Queue):
-    """Isolated Vosk worker process - crashes here won't affect main server."""
+# On the result pipe the worker sends (text, confidence) tuples, partial text
+# as str, _READY once its model has loaded and None to acknowledge _END_SESSION
+_READY = True
+
+# Seconds a loaded worker gets to flush the final result of a session
+_END_SESSION_TIMEOUT = 2.0
+
+@functools.cache
+def _model_path_exists(path: str) -> bool:
+    """Whether a model directory exists; cached, see clear_model_cache()."""
+    return os.path.exists(path)
+
+
+def clear_model_cache() -> None:
+    """Forget cached model directory checks, e.g. after installing a model."""
+    _model_path_exists.cache_clear()
+
+
+@functools.cache
+def _input_device() -> Any:
+    """Default input device info; PortAudio enumerates devices on every query."""
+    return sd.query_devices(kind="input")
+
+
+def clear_device_cache() -> None:
+    """Forget the cached input device, e.g. after plugging in a microphone."""
+    _input_device.cache_clear()
+
+
+def _can_write(conn: Connection) -> bool:
+    """Whether a marker, smaller than PIPE_BUF, can be sent without blocking."""
+    return bool(select.select([], [conn.fileno()], [], 0)[1])
+
+
+def _create_recognizer(
+    model: vosk.Model,
+    sample_rate: int,
+    vad_silence_ms: int | None,
+    word_timestamps: bool = False,
+) -> vosk.KaldiRecognizer:
+    """Create a recognizer, applying the endpointer delay where vosk supports it."""
+    recognizer = vosk.KaldiRecognizer(model, sample_rate)
+    # Only text is read from results: without words the JSON is a fraction
+    # of the size and extract_result never needs a full parse
+    recognizer.SetWords(word_timestamps)
+    if vad_silence_ms is not None and hasattr(recognizer, "SetEndpointerDelays"):
+        # Kaldi's defaults for the leading silence and maximum utterance length
+        recognizer.SetEndpointerDelays(5.0, vad_silence_ms / 1000, 20.0)
+    return recognizer
+
+
+def _vosk_worker_process(
+    model_path: str,
+    sample_rate: int,
+    audio_reader: Connection,
+    result_writer: Connection,
+    vad_silence_ms: int | None = None,
+    word_timestamps: bool = False,
+):
+    """
+    Isolated Vosk worker process - crashes here won't affect main server.
+
+    Sends (text, confidence) tuples for results and, in sessions opened with
+    _SEND_PARTIALS, the partial text as a plain str whenever it changes.
+    """
     try:
-        import vosk
-        import json
-        
         # Initialize Vosk in isolated process
         vosk.SetLogLevel(-1)
         model = vosk.Model(model_path)
-        recognizer = vosk.KaldiRecognizer(model, sample_rate)
-        recognizer.SetWords(True)
-        
+        recognizer = _create_recognizer(
+            model, sample_rate, vad_silence_ms, word_timestamps
+        )
+        last_partial = ""
+        send_partials = False
+        result_writer.send(_READY)
+
+        # Bound once: the loop runs for every audio block
+        poll = audio_reader.poll
+        recv_bytes = audio_reader.recv_bytes
+        send_result = result_writer.send
+
         while True:
+            # Get raw audio bytes from main process (no pickling)
             try:
-                # Get audio data from main process
-                data = input_queue.get(timeout=1.0)
-                if data is None:  # Shutdown signal
-                    break
-                
-                # Process with Vosk - if this crashes, only this process dies
-                if recognizer.AcceptWaveform(data):
-                    result = json.loads(recognizer.Result())
-                    text = result.get("text", "").strip()
-                    confidence = result.get("confidence", 0.0)
+                if not poll(1.0):
+                    continue
+                data = recv_bytes()
+            except (EOFError, OSError):
+                break  # Main process closed the pipe
+            if data == _SHUTDOWN:
+                break
+            if data == _SEND_PARTIALS:
+                send_partials = True
+                continue
+
+            # Process with Vosk - if this crashes, only this process dies
+            try:
+                if data == _END_SESSION:
+                    # Flush the last utterance; FinalResult also resets the
+                    # recognizer, so the loaded model serves the next session
+                    last_partial = ""
+                    send_partials = False
+                    text, confidence = extract_result(recognizer.FinalResult())
+                    if text:
+                        send_result((text, confidence))
+                    send_result(None)
+                elif recognizer.AcceptWaveform(data):
+                    last_partial = ""
+                    text, confidence = extract_result(recognizer.Result())
                     if text:
-                        output_queue.put((text, confidence))
-                        
+                        send_result((text, confidence))
+                elif send_partials:
+                    # Only changed partials are parsed and sent
+                    partial = recognizer.PartialResult()
+                    if partial != last_partial:
+                        last_partial = partial
+                        send_result(loads(partial).get("partial", ""))
+            except (EOFError, OSError):
+                break  # Main process stopped reading results
             except Exception:
-                # If Vosk crashes, create new recognizer
+                # Only a recognizer failure warrants rebuilding it
                 try:
-                    recognizer = vosk.KaldiRecognizer(model, sample_rate)
-                    recognizer.SetWords(True)
+                    recognizer = _create_recognizer(
+                        model, sample_rate, vad_silence_ms, word_timestamps
+                    )
+                    last_partial = ""
                 except:
                     pass
-                
+
     except Exception:
         pass  # Worker process can die, main server continues
 
@@ -69,6 +174,18 @@ class VoskEngine:
     models, audio settings, and callback support.
     """
 
+    __slots__ = (
+        "config",
+        "language",
+        "is_listening",
+        "model_path",
+        "worker_process",
+        "_audio_writer",
+        "_result_reader",
+        "_worker_ready",
+        "_last_status_warning",
+    )
+
     def __init__(
         self,
         model_path: str | Path | None = None,
@@ -90,12 +207,14 @@ class VoskEngine:
         self.config = config or settings.vosk
         self.language = language
         self.is_listening = False
-        self.audio_queue: queue.Queue[bytes] = queue.Queue()
+        self._last_status_warning = 0.0
         
-        # Process isolation for Vosk
+        # Process isolation for Vosk: the worker keeps the model loaded across
+        # sessions and is only restarted if it dies (see close())
         self.worker_process: multiprocessing.Process | None = None
-        self.input_queue: multiprocessing.Queue = multiprocessing.Queue()
-        self.output_queue: multiprocessing.Queue = multiprocessing.Queue()
+        self._audio_writer: Connection | None = None
+        self._result_reader: Connection | None = None
+        self._worker_ready = False
 
         # Determine model path
         if model_path:
@@ -112,46 +231,39 @@ class VoskEngine:
         if not self.model_path.exists():
             raise ModelNotFoundError(f"Model not found: {self.model_path}")
 
+        if self.config.vad_silence_ms is not None and not hasattr(
+            vosk.KaldiRecognizer, "SetEndpointerDelays"
+        ):
+            logger.warning(
+                "vad_silence_ms is ignored: this vosk version has no SetEndpointerDelays"
+            )
+
         self._setup_audio_device()
         # Vosk initialization moved to worker process
 
-        logger.info(f"VoskEngine initialized with model: {self.model_path.name}")
-
-    def _initialize_vosk(self) -> None:
-        """Initialize Vosk model and recognizer."""
-        # Configure Vosk logging
-        vosk.SetLogLevel(-1 if not self.config.verbose else 0)
-
-        logger.info(f"Loading Vosk model: {self.model_path.name}")
-        try:
-            self.model = vosk.Model(str(self.model_path))
-            self.recognizer = vosk.KaldiRecognizer(self.model, self.config.sample_rate)
-            self.recognizer.SetWords(True)
-            logger.info("Vosk model loaded successfully")
-        except Exception as e:
-            raise ModelNotFoundError(f"Failed to load Vosk model: {e}") from e
+        logger.info("VoskEngine initialized with model: %s", self.model_path.name)
 
     def _setup_audio_device(self) -> None:
         """Setup audio device and validate configuration."""
         try:
-            device_info = sd.query_devices(kind="input")
-            logger.info(f"🎤 Selected audio device: {device_info['name']}")
-            logger.info(f"Sample rate: {self.config.sample_rate}Hz")
+            device_info = _input_device()
+            logger.info("🎤 Selected audio device: %s", device_info['name'])
+            logger.info("Sample rate: %sHz", self.config.sample_rate)
         except Exception as e:
             raise AudioDeviceError(f"Failed to setup audio device: {e}") from e
 
-    def _audio_callback(
-        self, indata: bytes, frames: int, time: float, status: str
-    ) -> None:
-        """Audio stream callback."""
-        if status:
-            logger.warning(f"Audio stream warning: {status}")
-        self.audio_queue.put(bytes(indata))
+    def _warn_audio_status(self, status: Any) -> None:
+        """Log an audio stream problem, at most once a second."""
+        now = time.monotonic()
+        if now - self._last_status_warning > 1.0:
+            self._last_status_warning = now
+            logger.warning("Audio stream warning: %s", status)
 
     def start_listening(
         self,
         callback: Callable[[str, float], None] | None = None,
         duration: float | None = None,
+        partial_callback: Callable[[str], None] | None = None,
     ) -> None:
         """
         Start continuous speech recognition.
@@ -159,6 +271,8 @@ class VoskEngine:
         Args:
             callback: Function called for each recognition result (text, confidence)
             duration: Duration in seconds (None for infinite)
+            partial_callback: Function called with the partial text of the
+                current utterance whenever it changes
 
         Raises:
             AudioDeviceError: If audio stream fails to start
@@ -166,106 +280,214 @@ class VoskEngine:
         self.is_listening = True
         start_time = time.time()
 
-        # Start isolated Vosk worker process
-        logger.info("🚀 Starting isolated Vosk worker process")
-        self.worker_process = multiprocessing.Process(
-            target=_vosk_worker_process,
-            args=(str(self.model_path), self.config.sample_rate, self.input_queue, self.output_queue)
-        )
-        self.worker_process.start()
+        audio_writer, result_reader = self._ensure_worker()
+        deadline = start_time + duration if duration else None
 
         try:
+            # No callback: PortAudio buffers the input itself and the capture
+            # thread reads it with the GIL released, so no Python code runs on
+            # the realtime audio thread
             with sd.RawInputStream(
                 samplerate=self.config.sample_rate,
                 blocksize=self.config.block_size,
                 dtype=self.config.dtype,
                 channels=self.config.channels,
-                callback=self._audio_callback,
-            ):
+                latency=self.config.latency,
+            ) as stream:
                 logger.info("Speech recognition started")
                 if duration:
-                    logger.info(f"Duration: {duration} seconds")
-
-                while self.is_listening:
-                    # Check duration limit
-                    if duration and (time.time() - start_time) > duration:
-                        logger.info("Duration limit reached")
-                        break
-
-                    try:
-                        # Get audio data
-                        data = self.audio_queue.get(timeout=0.1)
-                        
-                        # Send to isolated worker process
-                        try:
-                            self.input_queue.put_nowait(data)
-                        except:
-                            pass  # Queue full, skip frame
-                        
-                        # Check for results from worker
+                    logger.info("Duration: %s seconds", duration)
+
+                # Audio is captured by its own thread, so this loop only wakes on results
+                capture = threading.Thread(
+                    target=self._capture_audio,
+                    args=(
+                        stream,
+                        audio_writer.send_bytes,
+                        partial_callback is not None,
+                    ),
+                    daemon=True,
+                )
+                capture.start()
+                try:
+                    while self.is_listening:
+                        # Check duration limit
+                        if deadline and time.time() > deadline:
+                            logger.info("Duration limit reached")
+                            break
+
+                        # Block until the worker has a result (or 100 ms pass)
+                        if not result_reader.poll(0.1):
+                            continue
                         try:
-                            result = self.output_queue.get_nowait()
-                            if result:
-                                text, confidence = result
-                                logger.debug(f"Recognition: [{confidence:.2f}] {text}")
-
-                                if callback:
-                                    callback(text, confidence)
-                                else:
-                                    logger.info(f"Recognized: {text}")
-                        except:
-                            pass  # No result yet
-
-                    except queue.Empty:
-                        continue
+                            result = result_reader.recv()
+                        except EOFError:
+                            logger.error("Vosk worker process exited")
+                            break
+
+                        if result is _READY:
+                            self._worker_ready = True
+                            continue
+                        if isinstance(result, str):
+                            if partial_callback:
+                                partial_callback(result)
+                            continue
+
+                        text, confidence = result
+                        logger.debug("Recognition: [%.2f] %s", confidence, text)
+                        if callback:
+                            callback(text, confidence)
+                        else:
+                            logger.info("Recognized: %s", text)
+                finally:
+                    # Inside the stream block: it must outlive the capture thread
+                    self.is_listening = False
+                    self._end_session(capture, result_reader, callback)
 
         except KeyboardInterrupt:
             logger.info("Speech recognition stopped by user")
         except Exception as e:
             raise AudioDeviceError(f"Audio stream error: {e}") from e
         finally:
-            # Cleanup worker process
-            if self.worker_process and self.worker_process.is_alive():
-                self.input_queue.put(None)  # Shutdown signal
-                self.worker_process.join(timeout=2)
-                if self.worker_process.is_alive():
-                    self.worker_process.terminate()
-            self._finalize_recognition(callback)
-
-    def _process_recognition_result(self) -> tuple[str, float] | None:
-        """Process recognition result from Vosk."""
-        try:
-            result = json.loads(self.recognizer.Result())
-            text = result.get("text", "").strip()
-            confidence = result.get("confidence", 0.0)
-
-            if text:
-                return text, confidence
-
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Failed to process recognition result: {e}")
-
-        return None
-
-    def _finalize_recognition(
-        self, callback: Callable[[str, float], None] | None = None
+            self.is_listening = False
+
+    def warm_up(self) -> None:
+        """Start the worker process now so the model is loaded before listening."""
+        self._ensure_worker()
+
+    def _ensure_worker(self) -> tuple[Connection, Connection]:
+        """Start the Vosk worker unless one is already running with the model loaded."""
+        if (
+            self.worker_process
+            and self.worker_process.is_alive()
+            and self._audio_writer
+            and self._result_reader
+        ):
+            return self._audio_writer, self._result_reader
+
+        self.close()
+        logger.info("🚀 Starting isolated Vosk worker process")
+        audio_reader, audio_writer = multiprocessing.Pipe(duplex=False)
+        result_reader, result_writer = multiprocessing.Pipe(duplex=False)
+        self.worker_process = multiprocessing.Process(
+            target=_vosk_worker_process,
+            args=(
+                str(self.model_path),
+                self.config.sample_rate,
+                audio_reader,
+                result_writer,
+                self.config.vad_silence_ms,
+                self.config.word_timestamps,
+            ),
+            daemon=True,
+        )
+        self.worker_process.start()
+        # Drop the worker's pipe ends here: if it dies, sends fail and
+        # result reads hit EOF instead of blocking
+        audio_reader.close()
+        result_writer.close()
+        self._audio_writer = audio_writer
+        self._result_reader = result_reader
+        self._worker_ready = False
+        return audio_writer, result_reader
+
+    def _end_session(
+        self,
+        capture: threading.Thread,
+        result_reader: Connection,
+        callback: Callable[[str, float], None] | None,
     ) -> None:
-        """Process final recognition result."""
-        self.is_listening = False
-
+        """Wait for the worker to flush the session, keeping it alive for the next one."""
         try:
-            final_result = json.loads(self.recognizer.FinalResult())
-            final_text = final_result.get("text", "").strip()
-
-            if final_text:
-                confidence = final_result.get("confidence", 0.0)
-                logger.info(f"Final recognition: {final_text}")
-
+            deadline = None
+            while True:
+                if deadline is None and self._worker_ready:
+                    deadline = time.monotonic() + _END_SESSION_TIMEOUT
+                if deadline is None:
+                    # Still loading the model, which can take longer than any
+                    # fixed timeout: wait for as long as the worker is alive
+                    if not (self.worker_process and self.worker_process.is_alive()):
+                        break
+                    if not result_reader.poll(0.5):
+                        continue
+                elif not result_reader.poll(max(0.0, deadline - time.monotonic())):
+                    break
+                result = result_reader.recv()
+                if result is _READY:
+                    self._worker_ready = True
+                    continue
+                if result is None:
+                    # Acknowledges _END_SESSION, the capture thread's last write
+                    capture.join()
+                    return
+                if isinstance(result, str):
+                    continue  # Partial text, superseded by the final result
+                text, confidence = result
+                logger.info("Final recognition: %s", text)
                 if callback:
-                    callback(final_text, confidence)
+                    callback(text, confidence)
+        except (EOFError, OSError):
+            pass
+        # No acknowledgement: the worker is dead or stuck. Kill it first, so a
+        # capture thread blocked on the full pipe fails instead of hanging,
+        # then replace it so the model reloads in the background.
+        logger.warning("Vosk worker did not finish the session, restarting it")
+        if self.worker_process:
+            self.worker_process.terminate()
+        capture.join()
+        self.close()
+        self.warm_up()
+
+    def close(self) -> None:
+        """Shut down the Vosk worker process."""
+        if self.worker_process and self.worker_process.is_alive():
+            # A worker that is busy or stuck may have left the pipe full
+            if self._audio_writer and _can_write(self._audio_writer):
+                try:
+                    self._audio_writer.send_bytes(_SHUTDOWN)
+                except OSError:
+                    pass
+            self.worker_process.join(timeout=2)
+            if self.worker_process.is_alive():
+                self.worker_process.terminate()
+        self.worker_process = None
+        for conn in (self._audio_writer, self._result_reader):
+            if conn:
+                conn.close()
+        self._audio_writer = None
+        self._result_reader = None
+
+    def _capture_audio(
+        self,
+        stream: sd.RawInputStream,
+        send_bytes: Callable[[Any], None],
+        send_partials: bool = False,
+    ) -> None:
+        """
+        Read blocks from the input stream into the worker pipe until listening stops.
 
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Failed to process final result: {e}")
+        This thread is the only writer on the audio pipe during a session, so
+        messages never interleave; its last message is _END_SESSION.
+        """
+        read = stream.read
+        block_size = self.config.block_size
+        try:
+            if send_partials:
+                send_bytes(_SEND_PARTIALS)
+            while self.is_listening:
+                data, overflowed = read(block_size)
+                if overflowed:
+                    self._warn_audio_status("input overflow")
+
+                # send_bytes copies the block into the pipe, no bytes() needed
+                send_bytes(data)
+        except OSError:
+            pass  # Worker gone: _end_session gets no acknowledgement
+        finally:
+            try:
+                send_bytes(_END_SESSION)
+            except OSError:
+                pass
 
     def stop_listening(self) -> None:
         """Stop speech recognition."""
@@ -274,4 +496,7 @@ class VoskEngine:
 
     def get_supported_languages(self) -> list[str]:
         """Get list of supported languages based on available models."""
-        return [lang for lang, path in self.config.model_paths.items() if path.exists()]
+        return [
+            lang for lang, path in self.config.model_paths.items()
+            if _model_path_exists(str(path))
+        ]
@@ -0,0 +1,19 @@
+"""Event loop entry point shared by the servers, the client and the scripts.
+
+Uses uvloop when it is installed (see requirements-optional.txt) and the
+standard asyncio loop otherwise.
+"""
+
+from collections.abc import Coroutine
+from typing import Any
+
+try:
+    # Optional libuv-based event loop, faster websocket/subprocess I/O
+    from uvloop import run as _run
+except ImportError:  # not installed, or Windows
+    from asyncio import run as _run
+
+
+def run(main: Coroutine[Any, Any, Any]) -> Any:
+    """Run ``main`` to completion on a fresh event loop and return its result."""
+    return _run(main)
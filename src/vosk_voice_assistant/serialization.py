@@ -0,0 +1,40 @@
+"""JSON handling shared by the engine, the workers, the server and the clients.
+
+Uses orjson when it is installed (see requirements-optional.txt) and the
+standard library otherwise. Both backends behave the same to callers:
+``dumps`` returns ``str`` and ``loads`` accepts ``str`` or ``bytes`` and
+raises a ``json.JSONDecodeError`` subclass on invalid input.
+"""
+
+import json
+import re
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any) -> str:
+    """Serialize to a JSON string; text, so browser clients get text frames."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
+loads = orjson.loads if orjson is not None else json.loads
+
+
+# Vosk results have a fixed schema: an unescaped "text" value can be read directly
+_TEXT_RE = re.compile(r'"text"\s*:\s*"([^"\\]*)"')
+
+
+def extract_result(result: str) -> tuple[str, float]:
+    """Get (text, confidence) from a Vosk result without building the word list."""
+    if '"confidence"' not in result:
+        match = _TEXT_RE.search(result)
+        if match:
+            return match.group(1).strip(), 0.0
+    parsed = loads(result)
+    return parsed.get("text", "").strip(), parsed.get("confidence", 0.0)
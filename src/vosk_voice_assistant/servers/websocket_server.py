@@ -3,37 +3,81 @@
 import asyncio
 import json
 import logging
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Literal
 
 import websockets
+from websockets.asyncio.server import broadcast
 from websockets.exceptions import ConnectionClosed, InvalidMessage
 
 from ..config import settings
 from ..engine import VoskEngine
 from ..exceptions import VoskEngineError
 from ..logging_config import setup_logging
+from ..runtime import run
+from ..serialization import dumps, loads
 from ..text_correction import correct_text
 
-# Setup logging
 logger = logging.getLogger(__name__)
-setup_logging()
 
 
 class VoiceWebSocketServer:
     """Async WebSocket server for voice recognition services."""
 
+    __slots__ = (
+        "clients",
+        "engines",
+        "current_engine",
+        "is_permanent_mode",
+        "current_language",
+        "_engine_locks",
+        "_capture_locks",
+        "_capture_pool",
+        "_handlers",
+        "_message_cache",
+        "_input_devices",
+    )
+
     def __init__(self) -> None:
         """Initialize the WebSocket server."""
         self.clients: set[Any] = set()
         self.engines: dict[str, VoskEngine] = {}
+        self._engine_locks: dict[str, asyncio.Lock] = {}
+        # An engine has one worker, one pipe pair and one is_listening flag:
+        # its captures must not overlap
+        self._capture_locks: dict[str, asyncio.Lock] = {}
+        # Captures hold a thread for the whole session: keep them out of the
+        # default executor used for short blocking calls
+        self._capture_pool = ThreadPoolExecutor(
+            max_workers=settings.server.max_concurrent_captures,
+            thread_name_prefix="vosk-capture",
+        )
         self.current_engine: VoskEngine | None = None
         self.is_permanent_mode = False
         self.current_language = settings.server.default_language
+        # Serialized status messages by type, with the state they were built from
+        self._message_cache: dict[str, tuple[tuple[Any, ...], str]] = {}
+        # Input device names, queried from PortAudio on first use
+        self._input_devices: list[str] | None = None
+
+        # Command -> handler(websocket, data, client_id), with the aliases
+        # some clients use
+        self._handlers: dict[str, Callable[[Any, dict[str, Any], str], Awaitable[None]]] = {
+            "start_capture": self._handle_start_capture,
+            "start_single_capture": self._handle_start_capture,
+            "stop_capture": lambda ws, data, cid: self._handle_stop_capture(ws, cid),
+            "set_language": self._handle_set_language,
+            "switch_language": self._handle_set_language,
+            "get_status": lambda ws, data, cid: self._handle_get_status(ws, cid),
+        }
 
     async def start_server(self, ssl_cert: str | None = None, ssl_key: str | None = None) -> None:
         """Start the WebSocket server with optional SSL support."""
         logger.info(
-            f"Starting WebSocket server on {settings.websocket.host}:{settings.websocket.port}"
+            "Starting WebSocket server on %s:%s",
+            settings.websocket.host,
+            settings.websocket.port,
         )
 
         # Setup SSL context if certificates provided
@@ -43,10 +87,13 @@ class VoiceWebSocketServer:
             ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
             ssl_context.load_cert_chain(ssl_cert, ssl_key)
             protocol = "wss"
-            logger.info(f"🔒 SSL enabled - connect via {protocol}://{settings.websocket.host}:{settings.websocket.port}")
+            logger.info("🔒 SSL enabled - connect via %s://%s:%s", protocol, settings.websocket.host, settings.websocket.port)
         else:
             protocol = "ws"
-            logger.info(f"⚠️  No SSL - HTTPS sites may block connection to {protocol}://{settings.websocket.host}:{settings.websocket.port}")
+            logger.info("⚠️  No SSL - HTTPS sites may block connection to %s://%s:%s", protocol, settings.websocket.host, settings.websocket.port)
+
+        if settings.server.preload_models:
+            await self._preload_engines()
 
         async with websockets.serve(
             self.handle_client,
@@ -58,13 +105,27 @@ class VoiceWebSocketServer:
             ping_timeout=10,
             close_timeout=10,
         ):
-            logger.info(f"✅ WebSocket server started successfully on {protocol}://{settings.websocket.host}:{settings.websocket.port}")
-            await asyncio.Future()  # Run forever
+            logger.info("✅ WebSocket server started successfully on %s://%s:%s", protocol, settings.websocket.host, settings.websocket.port)
+            try:
+                await asyncio.Future()  # Run forever
+            finally:
+                await self.close()
+
+    async def close(self) -> None:
+        """Stop running captures and release engines and capture threads."""
+        for engine in self.engines.values():
+            engine.stop_listening()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._capture_pool.shutdown)
+        for engine in self.engines.values():
+            engine.close()
 
     async def handle_client(self, websocket: Any) -> None:
         """Handle new client connections."""
-        client_id = f"{websocket.remote_address[0]}:{websocket.remote_address[1]}"
-        logger.info(f"New client connected: {client_id}")
+        # Built once per connection and passed to every handler and log call
+        host, port = websocket.remote_address[:2]
+        client_id = f"{host}:{port}"
+        logger.info("New client connected: %s", client_id)
 
         self.clients.add(websocket)
 
@@ -74,11 +135,11 @@ class VoiceWebSocketServer:
             
             await self._process_client_messages(websocket, client_id)
         except ConnectionClosed:
-            logger.info(f"Client {client_id} disconnected normally")
+            logger.info("Client %s disconnected normally", client_id)
         except InvalidMessage as e:
-            logger.warning(f"Invalid message from {client_id}: {e}")
+            logger.warning("Invalid message from %s: %s", client_id, e)
         except Exception as e:
-            logger.error(f"Unexpected error with client {client_id}: {e}")
+            logger.error("Unexpected error with client %s: %s", client_id, e)
         finally:
             self.clients.discard(websocket)
 
@@ -88,12 +149,12 @@ class VoiceWebSocketServer:
         """Process messages from a client."""
         async for message in websocket:
             try:
-                data = json.loads(message)
+                data = loads(message)
                 await self._handle_message(websocket, data, client_id)
             except json.JSONDecodeError:
                 await self._send_error(websocket, "Invalid JSON format")
             except Exception as e:
-                logger.error(f"Error processing message from {client_id}: {e}")
+                logger.error("Error processing message from %s: %s", client_id, e)
                 await self._send_error(websocket, str(e))
 
     async def _handle_message(
@@ -103,21 +164,16 @@ class VoiceWebSocketServer:
         action = data.get("action")
         msg_type = data.get("type")  # Some clients might use "type" instead of "action"
         
-        logger.info(f"Received message from {client_id}: action={action}, type={msg_type}, data={data}")
+        logger.info("Received message from %s: action=%s, type=%s, data=%s", client_id, action, msg_type, data)
 
         # Check both "action" and "type" fields for compatibility
         command = action or msg_type
 
-        if command == "start_capture" or command == "start_single_capture":
-            await self._handle_start_capture(websocket, data, client_id)
-        elif command == "stop_capture":
-            await self._handle_stop_capture(websocket, client_id)
-        elif command == "set_language" or command == "switch_language":
-            await self._handle_set_language(websocket, data, client_id)
-        elif command == "get_status":
-            await self._handle_get_status(websocket, client_id)
+        handler = self._handlers.get(command)
+        if handler:
+            await handler(websocket, data, client_id)
         else:
-            logger.error(f"Unknown command from {client_id}: {command}")
+            logger.error("Unknown command from %s: %s", client_id, command)
             await self._send_error(websocket, f"Unknown action: {command}")
 
     async def _handle_start_capture(
@@ -127,45 +183,48 @@ class VoiceWebSocketServer:
         context = data.get("context", "browser")
         timeout = data.get("timeout", settings.server.timeout_seconds)
 
-        logger.info(f"Starting capture for {client_id}, context: {context}")
+        logger.info("Starting capture for %s, context: %s", client_id, context)
 
         try:
             engine = await self._get_or_create_engine(self.current_language)
             
-            # Test audio device before capture
-            import sounddevice as sd
-            logger.info(f"Available input devices: {[d['name'] for i, d in enumerate(sd.query_devices()) if d['max_input_channels'] > 0]}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Available input devices: %s", self._list_input_devices())
             
-            result = await self._capture_voice_with_timeout(engine, timeout, context)
+            lock = self._capture_locks.setdefault(engine.language, asyncio.Lock())
+            async with lock:
+                result = await self._capture_voice_with_timeout(
+                    engine, timeout, context
+                )
 
-            await websocket.send(json.dumps({
+            await websocket.send(dumps({
                 "type": "speech_result",
                 "text": result,
                 "context": context,
                 "language": self.current_language
             }))
-            logger.info(f"Sent speech result to client: '{result}'")
+            logger.info("Sent speech result to client: '%s'", result)
 
         except TimeoutError:
-            logger.error(f"Voice capture timeout for {client_id}")
+            logger.error("Voice capture timeout for %s", client_id)
             await self._send_error(websocket, "Voice capture timeout")
         except VoskEngineError as e:
-            logger.error(f"Voice engine error for {client_id}: {e}")
+            logger.error("Voice engine error for %s: %s", client_id, e)
             await self._send_error(websocket, f"Voice engine error: {e}")
         except Exception as e:
-            logger.error(f"Unexpected error in start_capture for {client_id}: {e}")
+            logger.error("Unexpected error in start_capture for %s: %s", client_id, e)
             await self._send_error(websocket, f"Capture failed: {e}")
 
     async def _handle_stop_capture(
         self, websocket: Any, client_id: str
     ) -> None:
         """Handle stop capture request."""
-        logger.info(f"Stopping capture for {client_id}")
+        logger.info("Stopping capture for %s", client_id)
 
         if self.current_engine:
             self.current_engine.stop_listening()
 
-        await websocket.send(json.dumps({
+        await websocket.send(dumps({
             "type": "status",
             "message": "Capture stopped"
         }))
@@ -178,12 +237,12 @@ class VoiceWebSocketServer:
             language = data.get("language", "it")
 
             if language not in ["it", "en"]:
-                logger.error(f"Unsupported language requested: {language}")
+                logger.error("Unsupported language requested: %s", language)
                 await self._send_error(websocket, f"Unsupported language: {language}")
                 return
 
             self.current_language = language
-            logger.info(f"Language changed to {language} for {client_id}")
+            logger.info("Language changed to %s for %s", language, client_id)
 
             # Send success response
             response = {
@@ -192,56 +251,103 @@ class VoiceWebSocketServer:
                 "available_languages": ["it", "en"],
                 "message": f"Language set to {language}"
             }
-            await websocket.send(json.dumps(response))
-            logger.info(f"Sent language response: {response}")
+            await websocket.send(dumps(response))
+            logger.info("Sent language response: %s", response)
         except Exception as e:
-            logger.error(f"Error setting language for {client_id}: {e}")
+            logger.error("Error setting language for %s: %s", client_id, e)
             await self._send_error(websocket, f"Language change failed: {e}")
 
     async def _handle_get_status(
         self, websocket: Any, client_id: str
     ) -> None:
         """Handle status request."""
-        status = {
-            "type": "status",
-            "language": self.current_language,
-            "permanent_mode": self.is_permanent_mode,
-            "connected_clients": len(self.clients),
-            "available_languages": list(settings.vosk.model_paths.keys())
-        }
+        languages = tuple(settings.vosk.model_paths)
+        status = self._cached_message(
+            ("status", self.current_language, self.is_permanent_mode, len(self.clients), languages),
+            lambda: {
+                "type": "status",
+                "language": self.current_language,
+                "permanent_mode": self.is_permanent_mode,
+                "connected_clients": len(self.clients),
+                "available_languages": list(languages)
+            },
+        )
 
-        await websocket.send(json.dumps(status))
+        await websocket.send(status)
 
     async def _get_or_create_engine(self, language: str) -> VoskEngine:
         """Get existing engine or create new one for language."""
-        if language not in self.engines:
-            model_path = settings.vosk.model_paths.get(language)
-            if not model_path or not model_path.exists():
-                raise VoskEngineError(f"Model not found for language: {language}")
-
-            self.engines[language] = VoskEngine(
-                model_path=str(model_path),
-                language=language
-            )
-
-        self.current_engine = self.engines[language]
+        self.current_engine = await self._create_engine(language)
         return self.current_engine
 
+    async def _create_engine(self, language: str) -> VoskEngine:
+        """Create the engine for a language once; later calls return it."""
+        if language not in self.engines:
+            # One creation per language even when clients ask concurrently
+            lock = self._engine_locks.setdefault(language, asyncio.Lock())
+            async with lock:
+                if language not in self.engines:
+                    model_path = settings.vosk.model_paths.get(language)
+                    if not model_path or not model_path.exists():
+                        raise VoskEngineError(
+                            f"Model not found for language: {language}"
+                        )
+
+                    # Engine setup queries the audio device: keep it off the event loop
+                    loop = asyncio.get_running_loop()
+                    self.engines[language] = await loop.run_in_executor(
+                        None, VoskEngine, str(model_path), language
+                    )
+
+        return self.engines[language]
+
+    async def _preload_engines(self) -> None:
+        """Create engines and load their models so first captures start hot."""
+        languages = list(settings.vosk.model_paths)
+        results = await asyncio.gather(
+            *(self._create_engine(language) for language in languages),
+            return_exceptions=True,
+        )
+        for language, result in zip(languages, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.warning("Not preloading %s engine: %s", language, result)
+            else:
+                # Starts the worker process, which loads the model in the background
+                result.warm_up()
+                logger.info("Preloading %s model", language)
+
+    def _list_input_devices(self) -> list[str]:
+        """Names of the audio input devices, enumerated once per server."""
+        if self._input_devices is None:
+            import sounddevice as sd
+            self._input_devices = [
+                d["name"] for d in sd.query_devices() if d["max_input_channels"] > 0
+            ]
+        return self._input_devices
+
     async def _capture_voice_with_timeout(
         self, engine: VoskEngine, timeout: int, context: str
     ) -> str:
         """Capture voice input with timeout."""
-        result_queue: asyncio.Queue[str] = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        result: asyncio.Future[str] = loop.create_future()
+
+        def set_result(text: str) -> None:
+            # Only the first utterance answers the request
+            if not result.done():
+                result.set_result(text)
 
         def on_result(text: str, confidence: float = 0.0) -> None:
             from typing import cast
-            logger.info(f"Callback received: text='{text}', confidence={confidence}")
+            logger.info("Callback received: text='%s', confidence=%s", text, confidence)
             corrected_text = correct_text(text, cast(Literal["browser", "terminal"], context))
-            # Use thread-safe method to put in queue
-            try:
-                result_queue.put_nowait(corrected_text)
-            except asyncio.QueueFull:
-                logger.warning("Result queue full, dropping result")
+            # Runs on the capture thread: futures are not thread-safe, so
+            # hand the result over to the event loop
+            loop.call_soon_threadsafe(set_result, corrected_text)
+            # One result answers the request: end the session from this
+            # thread instead of waiting for the event loop to stop it
+            if engine.is_listening:
+                engine.stop_listening()
 
         # Start listening in a separate task
         listen_task = asyncio.create_task(
@@ -250,24 +356,29 @@ class VoiceWebSocketServer:
 
         try:
             # Wait for result or timeout
-            logger.info(f"Waiting for voice result (timeout: {timeout}s)...")
-            result = await asyncio.wait_for(result_queue.get(), timeout=timeout)
-            logger.info(f"✅ Got voice result: '{result}'")
-            return result
+            logger.info("Waiting for voice result (timeout: %ss)...", timeout)
+            text = await asyncio.wait_for(result, timeout=timeout)
+            logger.info("✅ Got voice result: '%s'", text)
+            return text
         except TimeoutError:
-            logger.warning(f"Voice capture timed out after {timeout}s")
-            listen_task.cancel()
+            logger.warning("Voice capture timed out after %ss", timeout)
             raise
         finally:
-            if not listen_task.done():
-                listen_task.cancel()
+            # Cancelling the task cannot interrupt start_listening in its
+            # thread: stop the engine and wait for it to return. The stop is
+            # repeated in case the capture had not started listening yet.
+            while not listen_task.done():
+                engine.stop_listening()
+                await asyncio.wait({listen_task}, timeout=0.5)
+            if not listen_task.cancelled() and listen_task.exception():
+                logger.error("Voice capture failed: %s", listen_task.exception())
 
     async def _run_voice_capture(
         self, engine: VoskEngine, callback
     ) -> None:
         """Run voice capture in async context."""
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, engine.start_listening, callback)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._capture_pool, engine.start_listening, callback)
 
     async def _send_error(self, websocket: Any, message: str) -> None:
         """Send error message to client."""
@@ -275,50 +386,71 @@ class VoiceWebSocketServer:
             "type": "error",
             "message": message
         }
-        logger.error(f"Sending error response: {error_response}")
-        await websocket.send(json.dumps(error_response))
+        logger.error("Sending error response: %s", error_response)
+        await websocket.send(dumps(error_response))
 
     async def _send_language_status(self, websocket: Any) -> None:
         """Send language status to client."""
-        status = {
-            "type": "language_status",
-            "current_language": self.current_language,
-            "available_languages": list(settings.vosk.model_paths.keys()),
-            "corrections_enabled": self.current_language == "it",
-            "listening": self.is_permanent_mode
-        }
-        await websocket.send(json.dumps(status))
-        logger.info(f"Sent language status: {status}")
+        languages = tuple(settings.vosk.model_paths)
+        status = self._cached_message(
+            ("language_status", self.current_language, self.is_permanent_mode, languages),
+            lambda: {
+                "type": "language_status",
+                "current_language": self.current_language,
+                "available_languages": list(languages),
+                "corrections_enabled": self.current_language == "it",
+                "listening": self.is_permanent_mode
+            },
+        )
+        await websocket.send(status)
+        logger.info("Sent language status: %s", status)
+
+    def _cached_message(
+        self, key: tuple[Any, ...], build: Callable[[], dict[str, Any]]
+    ) -> str:
+        """
+        Serialize a status message, reusing the last one built from the same state.
+
+        Args:
+            key: Message type followed by the state the message depends on
+            build: Builds the message dict when the state has changed
+
+        Returns:
+            Serialized message
+        """
+        message_type = key[0]
+        cached = self._message_cache.get(message_type)
+        if cached is None or cached[0] != key:
+            cached = (key, dumps(build()))
+            self._message_cache[message_type] = cached
+        return cached[1]
 
     async def broadcast_message(self, message: dict[str, Any]) -> None:
         """Broadcast message to all connected clients."""
         if not self.clients:
             return
 
-        message_json = json.dumps(message)
-        disconnected_clients = set()
-
-        for client in self.clients:
-            try:
-                await client.send(message_json)
-            except websockets.exceptions.ConnectionClosed:
-                disconnected_clients.add(client)
-
-        # Remove disconnected clients
-        self.clients -= disconnected_clients
+        # websockets encodes the message once and writes the frame to every
+        # open connection without waiting for any of them to drain. Closed
+        # connections are skipped; handle_client removes them from the set.
+        broadcast(self.clients, dumps(message))
 
 
 async def start_voice_server(ssl_cert: str | None = None, ssl_key: str | None = None) -> None:
     """Start the voice WebSocket server with optional SSL support."""
+    # Configured by the entry point, not on import; an application that set
+    # up logging itself keeps its handlers
+    if not logging.getLogger().handlers:
+        setup_logging()
     server = VoiceWebSocketServer()
     await server.start_server(ssl_cert=ssl_cert, ssl_key=ssl_key)
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(start_voice_server())
+        run(start_voice_server())
     except KeyboardInterrupt:
         logger.info("Server stopped by user")
     except Exception as e:
-        logger.error(f"Server error: {e}")
+        logger.error("Server error: %s", e)
         raise
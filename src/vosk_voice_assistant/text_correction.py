@@ -1,7 +1,8 @@
 """Text correction utilities for voice input processing."""
 
 import re
-from typing import Literal, cast
+from collections.abc import Callable, Mapping
+from typing import Any, Literal, cast
 
 from .config import settings
 
@@ -32,21 +33,72 @@ def correct_text(
     return corrected_text
 
 
+# Compiled patterns by (compiler, id(mapping)). The settings mappings are
+# replaced rather than mutated in place, so the mapping object itself is the
+# key and no per-call key has to be built or hashed from its items
+_COMPILED: dict[tuple[Callable[..., Any], int], tuple[Mapping[str, str], Any]] = {}
+
+
+def _compiled(compile_fn: Callable[[Mapping[str, str]], Any], mapping: Mapping[str, str]) -> Any:
+    """Return compile_fn(mapping), computed once per mapping object."""
+    key = (compile_fn, id(mapping))
+    entry = _COMPILED.get(key)
+    # The identity check guards against an id reused by a newer mapping
+    if entry is None or entry[0] is not mapping:
+        if len(_COMPILED) >= 8:
+            _COMPILED.clear()
+        entry = _COMPILED[key] = (mapping, compile_fn(mapping))
+    return entry[1]
+
+
+def _compile_corrections(
+    terms: Mapping[str, str],
+) -> tuple[re.Pattern[str], dict[str, str]]:
+    """Build one alternation over all terms, longest first, plus its lookup table."""
+    table = {wrong.lower(): correct for wrong, correct in terms.items()}
+    alternatives = sorted(table, key=len, reverse=True)
+    pattern = re.compile("|".join(map(re.escape, alternatives)), re.IGNORECASE)
+    return pattern, table
+
+
 def _apply_tech_term_corrections(text: str) -> str:
     """Apply Italian tech term corrections for browser context."""
-    for wrong, correct in settings.text_correction.it_tech_terms.items():
-        pattern = re.compile(re.escape(wrong), re.IGNORECASE)
-        text = pattern.sub(correct, text)
-    return text
+    terms = settings.text_correction.it_tech_terms
+    if not terms:
+        return text
+    pattern, table = _compiled(_compile_corrections, terms)
+    return pattern.sub(lambda match: table[match.group(0).lower()], text)
+
+
+def _compile_command_prefixes(
+    commands: Mapping[str, str],
+) -> tuple[re.Pattern[str], dict[str, str], frozenset[str]]:
+    """Build an anchored alternation over voice commands, in configured order."""
+    table = dict(commands)
+    # Alternatives are tried in order, so the first configured command that
+    # is a whole-word prefix of the text wins, as with a loop over the dict
+    alternation = "|".join(map(re.escape, table))
+    pattern = re.compile(rf"(?:{alternation})(?= |\Z)")
+    # A command can only match text that starts with the command's first word
+    first_words = frozenset(word for key in table for word in key.split()[:1])
+    return pattern, table, first_words
 
 
 def _apply_linux_command_corrections(text: str) -> str:
     """Apply Linux command corrections for terminal context."""
-    for voice_cmd, real_cmd in settings.text_correction.linux_commands.items():
-        if text == voice_cmd or text.startswith(voice_cmd + " "):
-            remainder = text[len(voice_cmd):].strip()
-            return f"{real_cmd} {remainder}".strip() if remainder else real_cmd
-    return text
+    commands = settings.text_correction.linux_commands
+    if not commands:
+        return text
+    pattern, table, first_words = _compiled(_compile_command_prefixes, commands)
+    words = text.split(maxsplit=1)
+    if not words or words[0] not in first_words:
+        return text
+    match = pattern.match(text)
+    if not match:
+        return text
+    real_cmd = table[match.group(0)]
+    remainder = text[match.end():].strip()
+    return f"{real_cmd} {remainder}".strip() if remainder else real_cmd
 
 
 def get_available_corrections(context: Literal["browser", "terminal"]) -> dict[str, str]:
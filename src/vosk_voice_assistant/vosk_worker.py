@@ -5,9 +5,9 @@ This runs Vosk in a separate process to isolate assertion errors and crashes
 from the main WebSocket server.
 """
 
-import json
 import multiprocessing
 import queue
+import select
 import signal
 import time
 from pathlib import Path
@@ -17,16 +17,32 @@ import vosk
 
 from .config import settings
 from .logging_config import get_logger
+from .serialization import extract_result
 
 logger = get_logger(__name__)
 
+# Seconds to wait for room in the audio pipe before giving up on the worker,
+# as the bounded audio queue's put() used to
+AUDIO_SEND_TIMEOUT = 1.0
+
 
 class VoskWorkerProcess:
     """Isolated Vosk worker process with crash recovery."""
-    
+
+    __slots__ = (
+        "language",
+        "audio_reader",
+        "audio_writer",
+        "result_queue",
+        "control_queue",
+        "worker_process",
+        "is_running",
+    )
+
     def __init__(self, language: str = "it"):
         self.language = language
-        self.audio_queue = multiprocessing.Queue(maxsize=100)
+        # Raw audio bytes over a pipe: no pickling, no queue feeder thread
+        self.audio_reader, self.audio_writer = multiprocessing.Pipe(duplex=False)
         self.result_queue = multiprocessing.Queue(maxsize=50)
         self.control_queue = multiprocessing.Queue(maxsize=10)
         self.worker_process = None
@@ -37,10 +53,10 @@ class VoskWorkerProcess:
         if self.worker_process and self.worker_process.is_alive():
             return
             
-        logger.info(f"🚀 Starting Vosk worker process for {self.language}")
+        logger.info("🚀 Starting Vosk worker process for %s", self.language)
         self.worker_process = multiprocessing.Process(
             target=self._worker_main,
-            args=(self.language, self.audio_queue, self.result_queue, self.control_queue),
+            args=(self.language, self.audio_reader, self.result_queue, self.control_queue),
             daemon=True
         )
         self.worker_process.start()
@@ -77,8 +93,15 @@ class VoskWorkerProcess:
             self.restart_worker()
             
         try:
-            # Send audio to worker
-            self.audio_queue.put(("audio", audio_data), timeout=1)
+            # A hung worker stops draining the pipe: never block on a full one
+            writable = select.select(
+                [], [self.audio_writer.fileno()], [], AUDIO_SEND_TIMEOUT
+            )[1]
+            if not writable:
+                logger.warning("Worker process not reading audio, restarting...")
+                self.restart_worker()
+                return None
+            self.audio_writer.send_bytes(audio_data)
             
             # Wait for result
             start_time = time.time()
@@ -88,7 +111,7 @@ class VoskWorkerProcess:
                     if result_type == "result":
                         return result_data  # (text, confidence)
                     elif result_type == "error":
-                        logger.error(f"Worker process error: {result_data}")
+                        logger.error("Worker process error: %s", result_data)
                         return None
                 except queue.Empty:
                     continue
@@ -97,33 +120,37 @@ class VoskWorkerProcess:
             return None
             
         except Exception as e:
-            logger.error(f"Error communicating with worker process: {e}")
+            logger.error("Error communicating with worker process: %s", e)
             return None
             
     def restart_worker(self):
         """Restart crashed worker process."""
         logger.info("🔄 Restarting Vosk worker process")
         self.stop_worker()
+        # Fresh pipe: the old one may hold a frame half-written to the dead worker
+        self.audio_reader.close()
+        self.audio_writer.close()
+        self.audio_reader, self.audio_writer = multiprocessing.Pipe(duplex=False)
         time.sleep(1)  # Brief pause
         self.start_worker()
         
     @staticmethod
-    def _worker_main(language: str, audio_queue, result_queue, control_queue):
+    def _worker_main(language: str, audio_reader, result_queue, control_queue):
         """Main function for Vosk worker process."""
-        logger.info(f"🎤 Vosk worker process started for {language}")
+        logger.info("🎤 Vosk worker process started for %s", language)
         
         try:
             # Initialize Vosk in worker process
             model_path = settings.vosk.model_paths.get(language)
             if not model_path or not model_path.exists():
-                logger.error(f"Model not found for {language}: {model_path}")
+                logger.error("Model not found for %s: %s", language, model_path)
                 result_queue.put(("error", f"Model not found: {model_path}"))
                 return
                 
-            logger.info(f"Loading Vosk model: {model_path}")
+            logger.info("Loading Vosk model: %s", model_path)
             model = vosk.Model(str(model_path))
             recognizer = vosk.KaldiRecognizer(model, 16000)
-            recognizer.SetWords(True)
+            recognizer.SetWords(settings.vosk.word_timestamps)
             
             logger.info("✅ Vosk worker ready")
             
@@ -140,23 +167,21 @@ class VoskWorkerProcess:
                         pass
                         
                     # Process audio
-                    try:
-                        msg_type, audio_data = audio_queue.get(timeout=0.1)
-                        if msg_type == "audio":
-                            VoskWorkerProcess._process_audio_chunk(
-                                recognizer, audio_data, result_queue
-                            )
-                    except queue.Empty:
+                    if not audio_reader.poll(0.1):
                         continue
+                    audio_data = audio_reader.recv_bytes()
+                    VoskWorkerProcess._process_audio_chunk(
+                        recognizer, audio_data, result_queue
+                    )
                         
                 except KeyboardInterrupt:
                     break
                 except Exception as e:
-                    logger.error(f"Worker process error: {e}")
+                    logger.error("Worker process error: %s", e)
                     result_queue.put(("error", str(e)))
                     
         except Exception as e:
-            logger.error(f"Worker process initialization failed: {e}")
+            logger.error("Worker process initialization failed: %s", e)
             result_queue.put(("error", f"Initialization failed: {e}"))
             
         logger.info("🛑 Vosk worker process ended")
@@ -174,17 +199,15 @@ class VoskWorkerProcess:
             waveform_result = recognizer.AcceptWaveform(audio_data)
             
             if waveform_result:
-                result = json.loads(recognizer.Result())
-                text = result.get("text", "").strip()
-                confidence = result.get("confidence", 0.0)
+                text, confidence = extract_result(recognizer.Result())
                 
                 if text:
-                    logger.info(f"✅ Worker recognition: [{confidence:.2f}] {text}")
+                    logger.info("✅ Worker recognition: [%.2f] %s", confidence, text)
                     result_queue.put(("result", (text, confidence)))
                     
         except Exception as e:
             # This catches the assertion error indirectly
-            logger.warning(f"Audio processing error in worker: {e}")
+            logger.warning("Audio processing error in worker: %s", e)
             result_queue.put(("error", f"Processing error: {e}"))
 
 
@@ -0,0 +1,167 @@
+"""Tests for the Claude voice client helpers."""
+
+import shutil
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from src.vosk_voice_assistant.clients import claude_client
+from src.vosk_voice_assistant.clients.claude_client import (
+    ClaudeVoiceClient,
+    _render_template,
+)
+
+
+class TestRenderTemplate:
+    """Test the pre-parsed template renderer against str.format."""
+
+    @pytest.mark.parametrize(
+        "template",
+        [
+            "Explain this code: {context}",
+            "{a}{b} and {{literal}}",
+            "{a!r} {b!s} {c!a}",
+            "[{a:>6}] {n:04d} {f:.2f}",
+            "{a!r:>10}",
+            "no fields at all",
+        ],
+    )
+    def test_matches_str_format(self, template):
+        """Test conversions and format specs render exactly like str.format."""
+        values = {"a": "x", "b": "é", "c": "ü", "n": 7, "f": 3.14159, "context": "c"}
+
+        assert _render_template(template, values) == template.format(**values)
+
+    def test_missing_field_raises_key_error(self):
+        """Test that an unknown field raises KeyError as str.format does."""
+        with pytest.raises(KeyError, match="missing"):
+            _render_template("Fix {context} in {missing}", {"context": "code"})
+
+    def test_extra_values_are_ignored(self):
+        """Test that unused values do not affect the result."""
+        assert _render_template("{a}", {"a": 1, "b": 2}) == "1"
+
+    @pytest.mark.parametrize(
+        "template",
+        ["{obj.real}", "{items[0]}", "{a:{width}}"],
+    )
+    def test_complex_fields_fall_back_to_str_format(self, template):
+        """Test attribute, index and nested spec fields via str.format."""
+        values = {"obj": 5, "items": ["first"], "a": "x", "width": 4}
+
+        assert _render_template(template, values) == template.format(**values)
+
+
+class TestGitContext:
+    """Test git status parsing for the development context."""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        """Create a client without configuring logging."""
+        monkeypatch.setattr(claude_client, "_logging_configured", True)
+        return ClaudeVoiceClient()
+
+    @pytest.fixture
+    def git_status(self, monkeypatch):
+        """Make `git status` print the given porcelain v2 output."""
+        calls = []
+
+        def install(stdout):
+            def fake_run(args, **kwargs):
+                calls.append(args)
+                return SimpleNamespace(stdout=stdout, returncode=0)
+
+            monkeypatch.setattr(claude_client.subprocess, "run", fake_run)
+            return calls
+
+        return install
+
+    def test_branch_and_changes(self, client, git_status, tmp_path):
+        """Test that the branch head and changed entries are reported."""
+        git_status(
+            "# branch.oid 0123abcd\n"
+            "# branch.head feature/voice\n"
+            "# branch.upstream origin/feature/voice\n"
+            "# branch.ab +1 -0\n"
+            "1 .M N... 100644 100644 100644 aaa bbb src/a.py\n"
+            "2 R. N... 100644 100644 100644 aaa bbb R100 b.py\told.py\n"
+            "? notes.txt\n"
+        )
+
+        context = client._get_git_context(tmp_path)
+
+        assert context == {"git_branch": "feature/voice", "git_changes": "3"}
+
+    def test_detached_head_has_no_branch(self, client, git_status, tmp_path):
+        """Test that a detached HEAD maps to an empty branch name."""
+        git_status("# branch.oid 0123abcd\n# branch.head (detached)\n")
+
+        context = client._get_git_context(tmp_path)
+
+        assert context == {"git_branch": "", "git_changes": "0"}
+
+    def test_not_a_git_repo(self, client, monkeypatch, tmp_path):
+        """Test the fallback when git fails or is not installed."""
+
+        def fail(args, **kwargs):
+            raise subprocess.CalledProcessError(128, args)
+
+        monkeypatch.setattr(claude_client.subprocess, "run", fail)
+
+        context = client._get_git_context(tmp_path)
+
+        assert context == {"git_branch": "not-git-repo", "git_changes": "0"}
+
+    def test_result_is_cached(self, client, git_status, tmp_path):
+        """Test that git is queried once within GIT_CONTEXT_TTL."""
+        calls = git_status("# branch.head main\n")
+
+        first = client._get_git_context(tmp_path)
+        first["git_branch"] = "mutated"
+        second = client._get_git_context(tmp_path)
+
+        assert len(calls) == 1
+        assert second["git_branch"] == "main"
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+    def test_empty_repository(self, client, tmp_path):
+        """Test a freshly initialized repository with no commits."""
+        subprocess.run(
+            ["git", "init", "-q", "-b", "main"], cwd=tmp_path, check=True
+        )
+
+        context = client._get_git_context(tmp_path)
+
+        assert context == {"git_branch": "main", "git_changes": "0"}
+
+
+class TestFindClaudeCode:
+    """Test the cached claude-code executable lookup."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_lookup(self, monkeypatch):
+        """Start every test with no resolved executable."""
+        monkeypatch.setattr(claude_client, "_claude_code_path", None)
+
+    def test_miss_is_not_cached(self, monkeypatch):
+        """Test that a later install of the CLI is still found."""
+        found = iter([None, "/usr/bin/claude-code"])
+        monkeypatch.setattr(claude_client.shutil, "which", lambda name: next(found))
+
+        assert claude_client._find_claude_code() is None
+        assert claude_client._find_claude_code() == "/usr/bin/claude-code"
+
+    def test_hit_is_cached(self, monkeypatch):
+        """Test that a found executable is not looked up again."""
+        calls = []
+
+        def which(name):
+            calls.append(name)
+            return "/usr/bin/claude-code"
+
+        monkeypatch.setattr(claude_client.shutil, "which", which)
+
+        claude_client._find_claude_code()
+        assert claude_client._find_claude_code() == "/usr/bin/claude-code"
+        assert calls == ["claude-code"]
@@ -30,7 +30,11 @@ class TestCommandManager:
                     "safe": False,
                 },
             },
-            "allowed_directories": {"home": "{HOME}", "test_dir": "/tmp/test"},
+            "allowed_directories": {
+                "home": "{HOME}",
+                "test_dir": "/tmp/test",
+                "docs": "~/Documents",
+            },
             "search_settings": {
                 "max_query_length": 30,
                 "allowed_extensions": [".txt", ".py"],
@@ -75,6 +79,19 @@ class TestCommandManager:
         # {HOME} should be expanded to actual home directory
         assert directories["home"] == str(Path.home())
         assert directories["test_dir"] == "/tmp/test"
+        assert directories["docs"] == str(Path.home() / "Documents")
+
+    def test_allowed_directories_read_only(self, config_file):
+        """Test that allowed directories are exposed as a read-only view."""
+        manager = CommandManager(config_file)
+        directories = manager.get_allowed_directories()
+
+        with pytest.raises(TypeError):
+            directories["etc"] = "/etc"  # type: ignore[index]
+
+        copy = manager.get_allowed_directories_copy()
+        copy["etc"] = "/etc"
+        assert "etc" not in manager.get_allowed_directories()
 
     def test_command_description(self, config_file):
         """Test getting command descriptions."""
@@ -99,12 +116,32 @@ class TestCommandManager:
         assert manager.get_max_input_length() == 50
         assert manager.get_command_timeout() == 5
 
+    def test_dangerous_char_pattern(self, config_file):
+        """Test the compiled dangerous character pattern."""
+        manager = CommandManager(config_file)
+        pattern = manager.get_dangerous_char_pattern()
+
+        assert pattern.search("ls; rm -rf /") is not None
+        assert pattern.search("echo a && b") is not None
+        assert pattern.search("ls -la") is None
+        assert manager.get_dangerous_char_pattern() is pattern
+
+    def test_dangerous_character_helpers(self, config_file):
+        """Test checking and stripping dangerous characters."""
+        manager = CommandManager(config_file)
+
+        assert manager.contains_dangerous_characters("ls; pwd") is True
+        assert manager.contains_dangerous_characters("ls -la") is False
+        assert manager.strip_dangerous_characters("ls; pwd && id") == "ls pwd  id"
+
     def test_search_settings(self, config_file):
         """Test getting search settings."""
         manager = CommandManager(config_file)
 
         assert manager.get_max_search_query_length() == 30
         assert manager.get_allowed_extensions() == [".txt", ".py"]
+        assert manager.is_allowed_extension(".py") is True
+        assert manager.is_allowed_extension(".sh") is False
 
     def test_add_custom_command(self, config_file):
         """Test adding custom commands at runtime."""
@@ -160,6 +197,29 @@ class TestCommandManager:
         manager.reload_configuration()
         assert "new_command" in manager.commands
 
+    def test_cached_configuration_is_not_shared_mutably(self, config_file):
+        """Test that managers sharing a cached config do not see each other's edits."""
+        first = CommandManager(config_file)
+        first.add_custom_command("custom", ["ls"], "Custom command", safe=True)
+
+        second = CommandManager(config_file)
+
+        assert "custom" not in second.commands
+        assert second.get_allowed_directories()["home"] == str(Path.home())
+
+    def test_safe_commands_follow_changes(self, config_file):
+        """Test that cached safe commands are refreshed after changes."""
+        manager = CommandManager(config_file)
+        assert manager.get_safe_command_list() == ["test command"]
+
+        manager.add_custom_command("custom", ["ls"], "Custom command", safe=True)
+
+        assert manager.get_safe_command_list() == ["test command", "custom"]
+        assert manager.get_safe_commands()["custom"] == ["ls"]
+
+        manager.reload_configuration()
+        assert "custom" not in manager.get_safe_commands()
+
 
 class TestCommandManagerSingleton:
     """Test command manager singleton functionality."""
@@ -182,3 +242,13 @@ class TestCommandManagerSingleton:
         manager = get_command_manager()
         assert manager is not None
         assert isinstance(manager, CommandManager)
+
+    @patch("src.vosk_voice_assistant.command_manager._command_manager", None)
+    def test_get_command_manager_concurrent_first_access(self):
+        """Test that concurrent first calls share a single instance."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            managers = list(pool.map(lambda _: get_command_manager(), range(8)))
+
+        assert all(manager is managers[0] for manager in managers)
@@ -1,7 +1,5 @@
 """Tests for configuration management."""
 
-from unittest.mock import patch
-
 from src.vosk_voice_assistant.config import Settings, VoskConfig, WebSocketConfig
 
 
@@ -14,9 +12,12 @@ class TestVoskConfig:
 
         assert config.sample_rate == 16000
         assert config.verbose is False
-        assert config.block_size == 8000
+        assert config.block_size == 3200
+        assert config.vad_silence_ms is None
+        assert config.word_timestamps is False
         assert config.channels == 1
         assert config.dtype == "int16"
+        assert config.latency == "high"
         assert "it" in config.model_paths
         assert "en" in config.model_paths
 
@@ -69,14 +70,14 @@ class TestSettings:
         assert settings.log_level == "INFO"
         assert "%(asctime)s" in settings.log_format
 
-    @patch.dict("os.environ", {"VOSK_LOG_LEVEL": "DEBUG"})
-    def test_environment_variables(self):
+    def test_environment_variables(self, monkeypatch):
         """Test settings from environment variables."""
+        monkeypatch.setenv("VOSK_LOG_LEVEL", "DEBUG")
         settings = Settings()
         assert settings.log_level == "DEBUG"
 
-    @patch.dict("os.environ", {"VOSK_VOSK__SAMPLE_RATE": "22050"})
-    def test_nested_environment_variables(self):
+    def test_nested_environment_variables(self, monkeypatch):
         """Test nested configuration from environment variables."""
+        monkeypatch.setenv("VOSK_VOSK__SAMPLE_RATE", "22050")
         settings = Settings()
         assert settings.vosk.sample_rate == 22050
@@ -1,26 +1,47 @@
 """Tests for VoskEngine."""
 
-import shutil
-import tempfile
+import multiprocessing
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import Mock
 
 import pytest
 
 from src.vosk_voice_assistant.config import VoskConfig
-from src.vosk_voice_assistant.engine import VoskEngine
+from src.vosk_voice_assistant.engine import (
+    _READY,
+    _SHUTDOWN,
+    VoskEngine,
+    _vosk_worker_process,
+    clear_device_cache,
+    clear_model_cache,
+)
 from src.vosk_voice_assistant.exceptions import AudioDeviceError, ModelNotFoundError
 
 
 class TestVoskEngine:
     """Test VoskEngine class."""
 
+    @pytest.fixture(autouse=True)
+    def fresh_device_cache(self):
+        """Make every test query the patched audio device."""
+        clear_device_cache()
+        yield
+        clear_device_cache()
+
+    @pytest.fixture(scope="session")
+    def mock_model_path(self, tmp_path_factory):
+        """Create a mock model directory shared by the whole session."""
+        return tmp_path_factory.mktemp("vosk_model")
+
     @pytest.fixture
-    def mock_model_path(self):
-        """Create a temporary mock model directory."""
-        temp_dir = Path(tempfile.mkdtemp())
-        yield temp_dir
-        shutil.rmtree(temp_dir)
+    def engine_deps(self, monkeypatch):
+        """Replace Vosk and sounddevice in the engine module with mocks."""
+        mock_vosk = Mock()
+        mock_sd = Mock()
+        mock_sd.query_devices.return_value = {"name": "Test Device"}
+        monkeypatch.setattr("src.vosk_voice_assistant.engine.vosk", mock_vosk)
+        monkeypatch.setattr("src.vosk_voice_assistant.engine.sd", mock_sd)
+        return mock_sd, mock_vosk
 
     @pytest.fixture
     def mock_config(self, mock_model_path):
@@ -30,27 +51,34 @@ class TestVoskEngine:
             verbose=False,
         )
 
-    @patch("src.vosk_voice_assistant.engine.vosk")
-    @patch("src.vosk_voice_assistant.engine.sd")
+    @pytest.fixture
+    def make_engine(self, engine_deps, mock_model_path, mock_config):
+        """Return a factory for engines on the mocked model and configuration."""
+
+        def make(language="it"):
+            return VoskEngine(
+                model_path=mock_model_path,
+                language=language,
+                config=mock_config,
+            )
+
+        return make
+
     def test_engine_initialization_success(
-        self, mock_sd, mock_vosk, mock_config, mock_model_path
+        self, engine_deps, make_engine, mock_config, mock_model_path
     ):
         """Test successful engine initialization."""
-        mock_vosk.Model.return_value = Mock()
-        mock_vosk.KaldiRecognizer.return_value = Mock()
-        mock_sd.query_devices.return_value = {"name": "Test Device"}
+        _, mock_vosk = engine_deps
 
-        engine = VoskEngine(
-            model_path=mock_model_path,
-            language="it",
-            config=mock_config,
-        )
+        engine = make_engine()
 
         assert engine.model_path == mock_model_path
         assert engine.language == "it"
         assert engine.config == mock_config
         assert not engine.is_listening
-        mock_vosk.Model.assert_called_once_with(str(mock_model_path))
+        # The model is loaded by the worker process, started on first use
+        assert engine.worker_process is None
+        mock_vosk.Model.assert_not_called()
 
     def test_engine_initialization_model_not_found(self, mock_config):
         """Test engine initialization with non-existent model."""
@@ -63,80 +91,89 @@ class TestVoskEngine:
                 config=mock_config,
             )
 
-    @patch("src.vosk_voice_assistant.engine.vosk")
-    @patch("src.vosk_voice_assistant.engine.sd")
-    def test_engine_initialization_model_load_failure(
-        self, mock_sd, mock_vosk, mock_config, mock_model_path
-    ):
-        """Test engine initialization when Vosk model loading fails."""
+    def test_worker_loads_model_and_reports_ready(self, engine_deps, mock_model_path):
+        """Test that the worker loads the model once and then reports ready."""
+        _, mock_vosk = engine_deps
+        audio_reader, audio_writer = multiprocessing.Pipe(duplex=False)
+        result_reader, result_writer = multiprocessing.Pipe(duplex=False)
+        audio_writer.send_bytes(_SHUTDOWN)
+
+        _vosk_worker_process(
+            str(mock_model_path), 16000, audio_reader, result_writer
+        )
+
+        mock_vosk.Model.assert_called_once_with(str(mock_model_path))
+        assert result_reader.poll(0)
+        assert result_reader.recv() is _READY
+
+    def test_worker_model_load_failure(self, engine_deps, mock_model_path):
+        """Test that a worker whose model fails to load exits without ready."""
+        _, mock_vosk = engine_deps
         mock_vosk.Model.side_effect = Exception("Model load error")
-        mock_sd.query_devices.return_value = {"name": "Test Device"}
+        audio_reader, _ = multiprocessing.Pipe(duplex=False)
+        result_reader, result_writer = multiprocessing.Pipe(duplex=False)
 
-        with pytest.raises(ModelNotFoundError):
-            VoskEngine(
-                model_path=mock_model_path,
-                language="it",
-                config=mock_config,
-            )
+        _vosk_worker_process(
+            str(mock_model_path), 16000, audio_reader, result_writer
+        )
 
-    @patch("src.vosk_voice_assistant.engine.vosk")
-    @patch("src.vosk_voice_assistant.engine.sd")
-    def test_audio_device_setup_failure(
-        self, mock_sd, mock_vosk, mock_config, mock_model_path
-    ):
+        assert not result_reader.poll(0)
+
+    def test_audio_device_setup_failure(self, engine_deps, make_engine):
         """Test audio device setup failure."""
-        mock_vosk.Model.return_value = Mock()
-        mock_vosk.KaldiRecognizer.return_value = Mock()
+        mock_sd, _ = engine_deps
         mock_sd.query_devices.side_effect = Exception("Audio device error")
 
         with pytest.raises(AudioDeviceError):
-            VoskEngine(
-                model_path=mock_model_path,
-                language="it",
-                config=mock_config,
-            )
+            make_engine()
 
-    @patch("src.vosk_voice_assistant.engine.vosk")
-    @patch("src.vosk_voice_assistant.engine.sd")
-    def test_get_supported_languages(self, mock_sd, mock_vosk, mock_model_path):
+    def test_get_supported_languages(
+        self, engine_deps, mock_model_path, tmp_path_factory
+    ):
         """Test getting supported languages."""
-        mock_vosk.Model.return_value = Mock()
-        mock_vosk.KaldiRecognizer.return_value = Mock()
-        mock_sd.query_devices.return_value = {"name": "Test Device"}
-
-        # Create another temp directory for English model
-        en_model_path = Path(tempfile.mkdtemp())
-        try:
-            config = VoskConfig(
-                model_paths={"it": mock_model_path, "en": en_model_path},
-            )
-
-            engine = VoskEngine(
-                model_path=mock_model_path,
-                language="it",
-                config=config,
-            )
-
-            supported = engine.get_supported_languages()
-            assert "it" in supported
-            assert "en" in supported
-        finally:
-            shutil.rmtree(en_model_path)
-
-    @patch("src.vosk_voice_assistant.engine.vosk")
-    @patch("src.vosk_voice_assistant.engine.sd")
-    def test_stop_listening(self, mock_sd, mock_vosk, mock_config, mock_model_path):
-        """Test stopping speech recognition."""
-        mock_vosk.Model.return_value = Mock()
-        mock_vosk.KaldiRecognizer.return_value = Mock()
-        mock_sd.query_devices.return_value = {"name": "Test Device"}
+        en_model_path = tmp_path_factory.mktemp("vosk_en")
+        config = VoskConfig(
+            model_paths={"it": mock_model_path, "en": en_model_path},
+        )
 
         engine = VoskEngine(
             model_path=mock_model_path,
             language="it",
-            config=mock_config,
+            config=config,
         )
 
+        supported = engine.get_supported_languages()
+        assert "it" in supported
+        assert "en" in supported
+
+    def test_supported_languages_cache(self, engine_deps, mock_model_path, tmp_path):
+        """Test that model checks are cached until clear_model_cache()."""
+        # Created below, outside the directory shared with the other tests
+        en_model_path = tmp_path / "en"
+        config = VoskConfig(model_paths={"it": mock_model_path, "en": en_model_path})
+        engine = VoskEngine(model_path=mock_model_path, language="it", config=config)
+
+        assert engine.get_supported_languages() == ["it"]
+
+        en_model_path.mkdir()
+        assert engine.get_supported_languages() == ["it"]
+
+        clear_model_cache()
+        assert engine.get_supported_languages() == ["it", "en"]
+
+    def test_stop_listening(self, make_engine):
+        """Test stopping speech recognition."""
+        engine = make_engine()
+
         engine.is_listening = True
         engine.stop_listening()
         assert not engine.is_listening
+
+    def test_input_device_queried_once(self, engine_deps, make_engine):
+        """Test that engines share the cached input device lookup."""
+        mock_sd, _ = engine_deps
+
+        for language in ("it", "en"):
+            make_engine(language)
+
+        mock_sd.query_devices.assert_called_once_with(kind="input")
@@ -1,5 +1,7 @@
 """Tests for custom exceptions."""
 
+import pytest
+
 from src.vosk_voice_assistant.exceptions import (
     AudioDeviceError,
     ConfigurationError,
@@ -18,26 +20,17 @@ class TestExceptions:
         assert str(exc) == "Base error"
         assert isinstance(exc, Exception)
 
-    def test_model_not_found_error(self):
-        """Test ModelNotFoundError."""
-        exc = ModelNotFoundError("Model not found")
-        assert str(exc) == "Model not found"
-        assert isinstance(exc, VoskVoiceAssistantError)
-
-    def test_audio_device_error(self):
-        """Test AudioDeviceError."""
-        exc = AudioDeviceError("Audio device error")
-        assert str(exc) == "Audio device error"
-        assert isinstance(exc, VoskVoiceAssistantError)
-
-    def test_websocket_error(self):
-        """Test WebSocketError."""
-        exc = WebSocketError("WebSocket error")
-        assert str(exc) == "WebSocket error"
-        assert isinstance(exc, VoskVoiceAssistantError)
-
-    def test_configuration_error(self):
-        """Test ConfigurationError."""
-        exc = ConfigurationError("Configuration error")
-        assert str(exc) == "Configuration error"
+    @pytest.mark.parametrize(
+        ("exc_cls", "message"),
+        [
+            (ModelNotFoundError, "Model not found"),
+            (AudioDeviceError, "Audio device error"),
+            (WebSocketError, "WebSocket error"),
+            (ConfigurationError, "Configuration error"),
+        ],
+    )
+    def test_subclass(self, exc_cls, message):
+        """Test that each error keeps its message and derives from the base."""
+        exc = exc_cls(message)
+        assert str(exc) == message
         assert isinstance(exc, VoskVoiceAssistantError)
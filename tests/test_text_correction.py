@@ -0,0 +1,104 @@
+"""Tests for voice text correction."""
+
+import pytest
+
+from src.vosk_voice_assistant.config import settings
+from src.vosk_voice_assistant.text_correction import correct_text
+
+
+@pytest.fixture
+def linux_commands(monkeypatch):
+    """Install a known set of terminal voice commands."""
+
+    def install(commands):
+        monkeypatch.setattr(settings.text_correction, "linux_commands", commands)
+
+    return install
+
+
+@pytest.fixture
+def tech_terms(monkeypatch):
+    """Install a known set of Italian tech term corrections."""
+    monkeypatch.setattr(settings.server, "default_language", "it")
+
+    def install(terms):
+        monkeypatch.setattr(settings.text_correction, "it_tech_terms", terms)
+
+    return install
+
+
+class TestLinuxCommandCorrections:
+    """Test prefix command matching in terminal context."""
+
+    def test_command_without_arguments(self, linux_commands):
+        """Test a spoken command with nothing after it."""
+        linux_commands({"spazio disco": "df -h"})
+
+        assert correct_text("spazio disco", "terminal") == "df -h"
+
+    def test_command_with_arguments(self, linux_commands):
+        """Test that words after the command are kept as arguments."""
+        linux_commands({"liste": "ls"})
+
+        assert correct_text("liste /tmp", "terminal") == "ls /tmp"
+        assert correct_text("Liste  la  home ", "terminal") == "ls la  home"
+
+    def test_prefix_must_end_on_word_boundary(self, linux_commands):
+        """Test that a command does not match inside a longer word."""
+        linux_commands({"git": "git"})
+
+        assert correct_text("github", "terminal") == "github"
+
+    def test_unknown_first_word_is_unchanged(self, linux_commands):
+        """Test that text not starting with a command is only lowercased."""
+        linux_commands({"liste": "ls"})
+
+        assert correct_text("Mostra liste", "terminal") == "mostra liste"
+
+    def test_first_configured_command_wins(self, linux_commands):
+        """Test that overlapping commands resolve in configured order."""
+        linux_commands({"liste": "ls", "liste la": "ls -la"})
+
+        assert correct_text("liste la home", "terminal") == "ls la home"
+
+    def test_longer_command_listed_first_wins(self, linux_commands):
+        """Test that a longer command wins when it is configured first."""
+        linux_commands({"liste la": "ls -la", "liste": "ls"})
+
+        assert correct_text("liste la home", "terminal") == "ls -la home"
+        assert correct_text("liste", "terminal") == "ls"
+
+    def test_no_commands_configured(self, linux_commands):
+        """Test that an empty command table leaves text lowercased."""
+        linux_commands({})
+
+        assert correct_text("Liste", "terminal") == "liste"
+
+
+class TestTechTermCorrections:
+    """Test tech term replacement in browser context."""
+
+    def test_replacement_is_case_insensitive(self, tech_terms):
+        """Test that terms match regardless of the spoken casing."""
+        tech_terms({"Pyton": "Python"})
+
+        assert correct_text("uso PYTON e pyton", "browser") == "uso Python e Python"
+
+    def test_longest_term_wins(self, tech_terms):
+        """Test that a longer term is preferred over its own prefix."""
+        tech_terms({"java": "Java", "java script": "JavaScript"})
+
+        assert correct_text("java script e java", "browser") == "JavaScript e Java"
+
+    def test_not_applied_in_terminal_context(self, tech_terms, linux_commands):
+        """Test that tech terms are a browser-only correction."""
+        tech_terms({"pyton": "Python"})
+        linux_commands({})
+
+        assert correct_text("pyton", "terminal") == "pyton"
+
+    def test_blank_text_is_returned_as_is(self, tech_terms):
+        """Test that whitespace-only text is not modified."""
+        tech_terms({"pyton": "Python"})
+
+        assert correct_text("   ", "browser") == "   "
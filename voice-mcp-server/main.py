@@ -2,8 +2,17 @@
 
 import asyncio
 import sys
-from src.server import VoiceMCPServer
+
 from src.config import Config
+from src.server import VoiceMCPServer
+
+try:
+    # Optional libuv-based event loop, faster stdio dispatch (not on Windows)
+    import uvloop
+
+    _runner = uvloop.run
+except ImportError:
+    _runner = asyncio.run
 
 async def main() -> None:
     """Main entry point."""
@@ -19,4 +28,4 @@ async def main() -> None:
         sys.exit(1)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    _runner(main())
\ No newline at end of file
@@ -1,6 +1,17 @@
 from pydantic import BaseModel, field_validator
 from typing import Any, Dict
 
+def validate_text(text: Any, max_length: int = 10000) -> str:
+    """Validate text input without building a model, returning it stripped."""
+    if not isinstance(text, str):
+        raise ValueError("Text must be a string")
+    stripped = text.strip()
+    if not stripped:
+        raise ValueError("Text cannot be empty")
+    if len(text) > max_length:
+        raise ValueError("Text exceeds maximum length")
+    return stripped
+
 class TextInput(BaseModel):
     """Validated text input model."""
     
@@ -10,11 +21,7 @@ class TextInput(BaseModel):
     @classmethod
     def validate_text(cls, v: str) -> str:
         """Validate text input."""
-        if not v.strip():
-            raise ValueError("Text cannot be empty")
-        if len(v) > 10000:
-            raise ValueError("Text exceeds maximum length")
-        return v.strip()
+        return validate_text(v)
 
 class ToolResponse(BaseModel):
     """Standardized tool response."""
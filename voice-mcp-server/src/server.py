@@ -1,6 +1,9 @@
 """Voice MCP Server for Claude Code integration."""
 
 import asyncio
+import sys
+import traceback
+from functools import lru_cache
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
@@ -8,15 +11,23 @@ from loguru import logger
 from typing import Dict, List, Any, Optional
 
 from .config import Config
-from .models import TextInput, ToolResponse
+from .models import validate_text
+
+
+@lru_cache(maxsize=1)
+def _default_config() -> Config:
+    """Configuration from the environment, read and validated once per process."""
+    return Config()
+
 
 class VoiceMCPServer:
     """MCP server for voice text injection with quality standards."""
     
     def __init__(self, config: Optional[Config] = None):
         """Initialize server with configuration."""
-        self.config = config or Config()
+        self.config = config or _default_config()
         self.server = Server(self.config.server_name)
+        self._tools = self._build_tools()
         self._configure_logging()
         self._register_tools()
         
@@ -27,7 +38,6 @@ class VoiceMCPServer:
 
     def _configure_logging(self) -> None:
         """Configure structured logging."""
-        import sys
         logger.remove()
         logger.add(
             sink=sys.stderr,  # Log to stderr, not stdout (MCP uses stdout for JSON)
@@ -35,29 +45,33 @@ class VoiceMCPServer:
             level=self.config.log_level
         )
 
+    def _build_tools(self) -> list[Tool]:
+        """Build the tool list once: the schemas only depend on the config."""
+        return [
+            Tool(
+                name="inject_text",
+                description="Inject validated text into the system",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "text": {
+                            "type": "string",
+                            "description": "Text to inject (max 10000 chars)",
+                            "maxLength": self.config.max_text_length
+                        }
+                    },
+                    "required": ["text"]
+                }
+            )
+        ]
+
     def _register_tools(self) -> None:
         """Register all available MCP tools."""
         
         @self.server.list_tools()
         async def list_tools() -> List[Tool]:
             """List all available tools."""
-            return [
-                Tool(
-                    name="inject_text",
-                    description="Inject validated text into the system",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "text": {
-                                "type": "string",
-                                "description": "Text to inject (max 10000 chars)",
-                                "maxLength": self.config.max_text_length
-                            }
-                        },
-                        "required": ["text"]
-                    }
-                )
-            ]
+            return self._tools
 
         @self.server.call_tool()
         async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
@@ -82,24 +96,18 @@ class VoiceMCPServer:
 
     async def _handle_inject_text(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Handle text injection with validation."""
-        # Validate input using Pydantic model
-        text_input = TextInput(**arguments)
-        
-        # Process text injection
-        response = ToolResponse(
-            success=True,
-            message=f"Text injected successfully: {text_input.text[:50]}...",
-            data={"text_length": len(text_input.text)}
-        )
+        # Same rules as the TextInput model, without building one per call
+        text = validate_text(arguments.get("text"), self.config.max_text_length)
         
-        logger.info("Text injection completed", extra={
-            "text_length": len(text_input.text),
-            "text_preview": text_input.text[:100]
+        # lazy: the context dict is only built if INFO records are emitted
+        logger.opt(lazy=True).info("Text injection completed", extra=lambda: {
+            "text_length": len(text),
+            "text_preview": text[:100]
         })
         
         return [TextContent(
             type="text",
-            text=f"✅ {response.message}"
+            text=f"✅ Text injected successfully: {text[:50]}..."
         )]
 
     async def run(self) -> None:
@@ -111,7 +119,6 @@ class VoiceMCPServer:
                 init_options = self.server.create_initialization_options()
                 await self.server.run(read_stream, write_stream, init_options)
         except Exception as e:
-            import traceback
             logger.error("Server failed to start", extra={
                 "error": str(e),
                 "error_type": type(e).__name__,